@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .connections import check_health_on_first_use
+        from .metrics import instrument_serializers
+        check_health_on_first_use()
+        instrument_serializers()
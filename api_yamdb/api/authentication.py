@@ -0,0 +1,86 @@
+import time
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews.models import User
+
+CLAIMS = ('username', 'role', 'is_superuser')
+TOKEN_STATE_KEY = 'auth:state:{}'
+# Сколько секунд кэш хранит отметку отзыва из базы; её сбрасывает
+# сохранение пользователя, срок только ограничивает гонку с ним
+TOKEN_STATE_TIMEOUT = 60
+
+
+def access_token_for(user):
+    """Access-токен, из которого можно собрать пользователя без базы"""
+    token = AccessToken.for_user(user)
+    token['iat'] = time.time()
+    for claim in CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def get_token_state(user_id):
+    """Пара (время отзыва токенов, активен ли пользователь).
+
+    Источник — таблица пользователей; кэш только экономит запрос,
+    поэтому промах ведёт в базу, а не считается отсутствием отзыва.
+    Строка читается из основной базы: отстающая реплика вернула бы
+    состояние до отзыва, и оно легло бы в кэш.
+    """
+    key = TOKEN_STATE_KEY.format(user_id)
+    state = cache.get(key)
+    if state is None:
+        row = User.objects.using(DEFAULT_DB_ALIAS).filter(
+            pk=user_id
+        ).values_list(
+            'tokens_valid_after', 'is_active'
+        ).first()
+        if row is None:
+            state = (0, False)
+        else:
+            valid_after, is_active = row
+            state = (valid_after.timestamp() if valid_after else 0,
+                     is_active)
+        cache.set(key, state, TOKEN_STATE_TIMEOUT)
+    return state
+
+
+def reset_token_state(user_id):
+    """Сбрасывает закэшированную отметку отзыва сейчас и после фиксации"""
+    key = TOKEN_STATE_KEY.format(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без запроса к таблице пользователей.
+
+    Пользователь собирается из claims токена; остальные поля
+    подгрузятся из базы при первом обращении. Отзыв токенов и блокировка
+    проверяются по закэшированной строке пользователя. Токены без claims
+    проверяются как раньше.
+    """
+
+    def get_user(self, validated_token):
+        if not all(claim in validated_token for claim in CLAIMS + ('iat',)):
+            return super().get_user(validated_token)
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        valid_after, is_active = get_token_state(user_id)
+        if not is_active:
+            raise AuthenticationFailed('Пользователь неактивен или удалён',
+                                       code='user_inactive')
+        if validated_token['iat'] < valid_after:
+            raise AuthenticationFailed('Токен отозван, получите новый',
+                                       code='token_revoked')
+        values = {claim: validated_token[claim] for claim in CLAIMS}
+        values['id'] = user_id
+        # from_db ждёт значения в порядке полей модели
+        field_names = [field.attname for field in User._meta.concrete_fields
+                       if field.attname in values]
+        return User.from_db(User.objects.db, field_names,
+                            [values[name] for name in field_names])
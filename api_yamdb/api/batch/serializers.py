@@ -0,0 +1,21 @@
+from rest_framework import serializers
+
+from ..serializers import CommentSerializer, ReviewSerializer
+
+
+class ReviewBatchItemSerializer(ReviewSerializer):
+    title_id = serializers.IntegerField()
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ('id', 'title_id', 'text', 'author', 'score', 'pub_date')
+
+    def validate(self, value):
+        # Произведения и повторные отзывы проверяются для всего пакета сразу
+        return value
+
+
+class CommentBatchItemSerializer(CommentSerializer):
+    review_id = serializers.IntegerField()
+
+    class Meta(CommentSerializer.Meta):
+        fields = ('id', 'review_id', 'text', 'author', 'pub_date')
@@ -0,0 +1,148 @@
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from reviews.bulk import bulk_insert
+from reviews.models import Comment, Review, Title
+from reviews.signals import bulk_created
+
+from .serializers import CommentBatchItemSerializer, ReviewBatchItemSerializer
+
+
+class BatchCreateView(APIView):
+    """Создаёт до API_BATCH_SIZE объектов одним запросом.
+
+    Элементы проверяются вместе, вставляются одним bulk_create,
+    а в ответе для каждого элемента свой статус. Если параллельная
+    запись нарушила ограничение, элементы вставляются по одному
+    в точках сохранения.
+    """
+    permission_classes = (IsAuthenticated, )
+    model = None
+    serializer_class = None
+
+    def check(self, items):
+        """Ошибки элементов, которые видны только на уровне пакета.
+
+        items — пары (номер, validated_data); возвращает словарь
+        номер -> (статус, сообщение).
+        """
+        return {}
+
+    def insert(self, items, results):
+        """Вставляет объекты одним запросом, а при IntegrityError — по одному.
+
+        items — тройки (номер, validated_data, объект); элементы, которые
+        не удалось вставить, получают ошибку в results. Возвращает пары
+        (номер, объект) вставленных.
+        """
+        if not items:
+            return []
+        try:
+            self.insert_objects([obj for _, _, obj in items])
+            return [(index, obj) for index, _, obj in items]
+        except IntegrityError:
+            pass
+        created = []
+        for index, data, obj in items:
+            obj.pk = None
+            try:
+                self.insert_objects([obj])
+            except IntegrityError:
+                code, message = self.check([(index, data)]).get(
+                    index, (status.HTTP_409_CONFLICT,
+                            'Конфликт с параллельной записью')
+                )
+                results[index] = {'status': code, 'errors': [message]}
+            else:
+                created.append((index, obj))
+        return created
+
+    def insert_objects(self, objects):
+        with transaction.atomic():
+            bulk_insert(self.model, objects)
+            # Внешние ключи проверяются сразу, а не при фиксации транзакции
+            connection.check_constraints(
+                table_names=[self.model._meta.db_table]
+            )
+
+    def post(self, request):
+        if not isinstance(request.data, list) or not request.data:
+            return Response('Ожидается непустой список объектов',
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(request.data) > settings.API_BATCH_SIZE:
+            return Response(
+                f'Не больше {settings.API_BATCH_SIZE} объектов за запрос',
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        results = [None] * len(request.data)
+        valid = []
+        for index, data in enumerate(request.data):
+            serializer = self.serializer_class(data=data)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                results[index] = {'status': status.HTTP_400_BAD_REQUEST,
+                                  'errors': serializer.errors}
+        with transaction.atomic():
+            # Проверки в той же транзакции, что и вставка; гонки с
+            # параллельной записью ловит insert
+            errors = self.check(valid)
+            for index, (code, message) in errors.items():
+                results[index] = {'status': code, 'errors': [message]}
+            created = self.insert([
+                (index, data, self.model(author=request.user, **data))
+                for index, data in valid if index not in errors
+            ], results)
+            if created:
+                bulk_created.send(sender=self.model,
+                                  objects=[obj for _, obj in created])
+        for index, obj in created:
+            results[index] = {'status': status.HTTP_201_CREATED,
+                              'data': self.serializer_class(obj).data}
+        return Response(
+            results,
+            status=(status.HTTP_201_CREATED
+                    if len(created) == len(results)
+                    else status.HTTP_207_MULTI_STATUS)
+        )
+
+
+class ReviewBatchView(BatchCreateView):
+    model = Review
+    serializer_class = ReviewBatchItemSerializer
+
+    def check(self, items):
+        title_ids = {data['title_id'] for _, data in items}
+        titles = set(Title.objects.filter(
+            pk__in=title_ids
+        ).values_list('pk', flat=True))
+        reviewed = set(Review.objects.filter(
+            author=self.request.user, title_id__in=titles
+        ).values_list('title_id', flat=True))
+        errors = {}
+        for index, data in items:
+            if data['title_id'] not in titles:
+                errors[index] = (status.HTTP_404_NOT_FOUND,
+                                 'Произведение не найдено')
+            elif data['title_id'] in reviewed:
+                errors[index] = (status.HTTP_400_BAD_REQUEST,
+                                 'Нельзя оставлять отзыв повторно!')
+            reviewed.add(data['title_id'])
+        return errors
+
+
+class CommentBatchView(BatchCreateView):
+    model = Comment
+    serializer_class = CommentBatchItemSerializer
+
+    def check(self, items):
+        reviews = set(Review.objects.filter(
+            pk__in={data['review_id'] for _, data in items}
+        ).values_list('pk', flat=True))
+        return {
+            index: (status.HTTP_404_NOT_FOUND, 'Отзыв не найден')
+            for index, data in items if data['review_id'] not in reviews
+        }
@@ -0,0 +1,78 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .conditional import VALIDATOR_HEADERS
+
+VERSION_KEY = 'api:version:{}'
+GLOBAL_NAMESPACE = 'all'
+RESPONSE_KEY = 'api:response:{}:{}:{}'
+
+
+def get_versions(namespaces):
+    """Текущие версии пространств имён кэша.
+
+    Отсутствующая версия заводится от текущего времени, чтобы после
+    вытеснения ключа из кэша она не совпала с одной из прежних.
+    """
+    keys = [VERSION_KEY.format(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump(*namespaces):
+    """Инвалидирует все ответы, закэшированные в этих пространствах имён.
+
+    Версии поднимаются ещё раз после коммита: ответ, прочитанный до
+    коммита, не должен остаться в кэше под новой версией.
+    """
+    increment(namespaces)
+    transaction.on_commit(lambda: increment(namespaces))
+
+
+def increment(namespaces):
+    for namespace in namespaces:
+        key = VERSION_KEY.format(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def response_key(request, namespaces):
+    params = sorted(
+        (name, value)
+        for name in request.query_params
+        for value in request.query_params.getlist(name)
+    )
+    digest = hashlib.md5(
+        f'{request.path}?{params}'.encode()
+    ).hexdigest()
+    versions = '.'.join(
+        str(version)
+        for version in get_versions((GLOBAL_NAMESPACE, *namespaces))
+    )
+    return RESPONSE_KEY.format(
+        request.accepted_renderer.format, versions, digest
+    )
+
+
+def store_response(key):
+    def callback(response):
+        headers = {
+            name: response[name]
+            for name in VALIDATOR_HEADERS if response.has_header(name)
+        }
+        cache.set(
+            key,
+            (response.content, response['Content-Type'], headers),
+            settings.API_CACHE_TIMEOUT,
+        )
+    return callback
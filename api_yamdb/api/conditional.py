@@ -0,0 +1,40 @@
+import hashlib
+from calendar import timegm
+
+from django.http import HttpResponseNotModified
+from django.utils.http import http_date, parse_etags, quote_etag
+
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+
+
+def make_etag(request, state):
+    """Сильный ETag из состояния данных и параметров представления"""
+    params = sorted(
+        (name, value)
+        for name in request.query_params
+        for value in request.query_params.getlist(name)
+    )
+    source = (f'{request.path}?{params}:{request.accepted_renderer.format}:'
+              f'{state}')
+    return quote_etag(hashlib.md5(source.encode()).hexdigest())
+
+
+def is_not_modified(request, etag):
+    etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    return etags == ['*'] or etag in etags
+
+
+def not_modified(headers):
+    response = HttpResponseNotModified()
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+def validator_headers(etag, last_modified=None):
+    headers = {'ETag': etag}
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(
+            timegm(last_modified.utctimetuple())
+        )
+    return headers
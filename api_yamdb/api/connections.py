@@ -0,0 +1,25 @@
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+
+def check_health_on_first_use():
+    """Проверяет постоянное соединение перед первым запросом к базе.
+
+    Django 2.2 замечает разрыв только на первой ошибке запроса;
+    CONN_HEALTH_CHECKS повторяет проверку из Django 4.1: соединение
+    проверяется один раз за запрос и только если запрос к нему обратился,
+    так что ответы из кэша и нетронутые реплики не платят за SELECT 1.
+    """
+    ensure_connection = BaseDatabaseWrapper.ensure_connection
+    if getattr(ensure_connection, 'health_checked', False):
+        return
+
+    def checked_ensure_connection(self):
+        if (self.connection is not None
+                and getattr(self, 'health_check_needed', False)):
+            self.health_check_needed = False
+            if not self.is_usable():
+                self.close()
+        ensure_connection(self)
+
+    checked_ensure_connection.health_checked = True
+    BaseDatabaseWrapper.ensure_connection = checked_ensure_connection
@@ -0,0 +1,42 @@
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from reviews.datasets import (EXPORT_FORMATS, get_dataset, has_pub_date,
+                              iter_rows, parse_since)
+
+from ..permissions import IsUserAdmin
+
+CHUNK_SIZE = 2000
+
+
+@api_view(['GET'])
+@permission_classes([IsUserAdmin])
+def api_export(request, dataset):
+    try:
+        dataset = get_dataset(dataset)
+    except LookupError:
+        return Response('Нет такого набора данных',
+                        status=status.HTTP_404_NOT_FOUND)
+    output = request.query_params.get('output', 'csv')
+    if output not in EXPORT_FORMATS:
+        return Response(f'Формат выгрузки: {", ".join(EXPORT_FORMATS)}',
+                        status=status.HTTP_400_BAD_REQUEST)
+    since = request.query_params.get('since')
+    if since is not None:
+        if not has_pub_date(dataset):
+            return Response('У набора данных нет даты публикации',
+                            status=status.HTTP_400_BAD_REQUEST)
+        since = parse_since(since)
+        if since is None:
+            return Response('Неверный формат даты since',
+                            status=status.HTTP_400_BAD_REQUEST)
+    lines, content_type = EXPORT_FORMATS[output]
+    response = StreamingHttpResponse(
+        lines(dataset, iter_rows(dataset, since, CHUNK_SIZE)),
+        content_type=content_type,
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="reviews_{dataset.name}.{output}"'
+    )
+    return response
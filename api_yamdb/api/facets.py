@@ -0,0 +1,57 @@
+from django.db.models import CharField, Count, F, Value
+from django.db.models.functions import Cast
+from reviews.models import Title
+
+YEAR_BUCKET = 10
+
+
+def genre_counts(titles):
+    return Title.genre.through.objects.filter(
+        title_id__in=titles.values('pk')
+    ).annotate(
+        facet=Value('genre', output_field=CharField()),
+        key=F('genre__slug'),
+    ).values('facet', 'key').annotate(count=Count('title_id')).order_by()
+
+
+def category_counts(titles):
+    return titles.filter(category__isnull=False).annotate(
+        facet=Value('category', output_field=CharField()),
+        key=F('category__slug'),
+    ).values('facet', 'key').annotate(count=Count('pk')).order_by()
+
+
+def year_counts(titles):
+    return titles.annotate(
+        facet=Value('year', output_field=CharField()),
+        key=Cast(F('year') / YEAR_BUCKET * YEAR_BUCKET, CharField()),
+    ).values('facet', 'key').annotate(count=Count('pk')).order_by()
+
+
+FACETS = {
+    'genre': genre_counts,
+    'category': category_counts,
+    'year': year_counts,
+}
+
+
+def facet_counts(filterset_class, data, queryset, names):
+    """Счётчики фасетов одним запросом UNION ALL из сгруппированных частей.
+
+    Счётчики фасета считаются по остальным фильтрам, без его собственных
+    параметров: показывают, сколько произведений будет, если выбрать ещё
+    и это значение. Годы группируются по десятилетиям.
+    """
+    parts = []
+    for name in names:
+        params = data.copy()
+        for param in filterset_class.facet_params[name]:
+            params.pop(param, None)
+        titles = filterset_class(params, queryset=queryset).qs.order_by()
+        parts.append(FACETS[name](titles))
+    counts = {name: {} for name in names}
+    if not parts:
+        return counts
+    for row in parts[0].union(*parts[1:], all=True):
+        counts[row['facet']][row['key']] = row['count']
+    return counts
@@ -1,12 +1,74 @@
+from django.db.models import Count, F
 from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter
 from reviews.models import Title
 
+GENRE_MODES = (
+    ('or', 'Любой из жанров'),
+    ('and', 'Все жанры'),
+)
+
+
+def split_values(value):
+    """drama, comedy -> ['drama', 'comedy']"""
+    return [item.strip() for item in value.split(',') if item.strip()]
+
 
 class TitleFilter(filters.FilterSet):
+    """genre и category принимают несколько slug через запятую;
+    genre_mode=and оставляет произведения со всеми указанными жанрами.
+    """
     name = filters.CharFilter(field_name='name', lookup_expr='icontains')
-    category = filters.CharFilter(field_name='category__slug')
-    genre = filters.CharFilter(field_name='genre__slug')
+    category = filters.CharFilter(method='filter_category')
+    genre = filters.CharFilter(method='filter_genre')
+    genre_mode = filters.ChoiceFilter(choices=GENRE_MODES,
+                                      method='filter_genre_mode')
+    year_min = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = filters.NumberFilter(field_name='year', lookup_expr='lte')
+    rating_min = filters.NumberFilter(field_name='rating', lookup_expr='gte')
+    rating_max = filters.NumberFilter(field_name='rating', lookup_expr='lte')
+
+    # Параметры каждого фасета: его счётчики считаются без них
+    facet_params = {
+        'genre': ('genre', 'genre_mode'),
+        'category': ('category', ),
+        'year': ('year', 'year_min', 'year_max'),
+    }
 
     class Meta:
         model = Title
         fields = ['name', 'year', 'genre', 'category']
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(category__slug__in=split_values(value))
+
+    def filter_genre(self, queryset, name, value):
+        slugs = set(split_values(value))
+        links = Title.genre.through.objects.filter(genre__slug__in=slugs)
+        if self.form.cleaned_data.get('genre_mode') == 'and':
+            links = links.values('title_id').annotate(
+                matched=Count('genre_id')
+            ).filter(matched=len(slugs))
+        # Подзапрос вместо JOIN: произведение с двумя жанрами не двоится
+        return queryset.filter(pk__in=links.values('title_id'))
+
+    def filter_genre_mode(self, queryset, name, value):
+        # Учитывается в filter_genre
+        return queryset
+
+
+class TitleOrderingFilter(OrderingFilter):
+    """?ordering=-rating,name: произведения без оценок всегда в конце,
+    при равенстве порядок по id, чтобы страницы не перекрывались.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+        expressions = [
+            F(field[1:]).desc(nulls_last=True) if field.startswith('-')
+            else F(field).asc(nulls_last=True)
+            for field in ordering
+        ]
+        return queryset.order_by(*expressions, 'id')
@@ -0,0 +1,217 @@
+import hashlib
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from rest_framework import serializers
+
+SERIES_KEY = 'metrics:series'
+VALUE_KEY = 'metrics:{}:{}'
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# Имя: (описание, границы корзин, множитель для целой суммы в кэше)
+HISTOGRAMS = {
+    'http_request_duration_seconds': (
+        'Время обработки запроса', DURATION_BUCKETS, 10 ** 6
+    ),
+    'db_queries_per_request': (
+        'Число запросов к базе за запрос', COUNT_BUCKETS, 1
+    ),
+    'db_duration_seconds': (
+        'Время запросов к базе за запрос', DURATION_BUCKETS, 10 ** 6
+    ),
+    'serializer_duration_seconds': (
+        'Время сериализаторов за запрос', DURATION_BUCKETS, 10 ** 6
+    ),
+    'http_response_size_bytes': (
+        'Размер ответа', SIZE_BUCKETS, 1
+    ),
+}
+COUNTERS = {
+    'http_requests_total': 'Все запросы, без выборки',
+}
+
+_local = threading.local()
+
+
+class Registry:
+    """Метрики процесса, которые периодически сливаются в общий кэш.
+
+    Наблюдение стоит одного захвата блокировки; раз в flush_seconds
+    накопленные приращения переносятся в кэш через incr, так что /metrics
+    любого воркера отдаёт сумму по всем воркерам и хостам.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = Counter()
+        self.series = set()
+        self.flushed = time.monotonic()
+
+    def observe(self, name, labels, value):
+        _, buckets, scale = HISTOGRAMS[name]
+        series = (name, labels)
+        with self.lock:
+            self.series.add(series)
+            self.pending[series, bisect_left(buckets, value)] += 1
+            self.pending[series, 'sum'] += round(value * scale)
+            self.pending[series, 'count'] += 1
+
+    def inc(self, name, labels):
+        series = (name, labels)
+        with self.lock:
+            self.series.add(series)
+            self.pending[series, 'value'] += 1
+
+    def maybe_flush(self, interval):
+        if time.monotonic() - self.flushed >= interval:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+            series = set(self.series)
+            self.flushed = time.monotonic()
+        known = cache.get(SERIES_KEY, set())
+        if not series <= known:
+            # Гонка двух воркеров теряет серию лишь до следующего слива
+            cache.set(SERIES_KEY, known | series, timeout=None)
+        for (item, field), delta in pending.items():
+            key = value_key(item, field)
+            try:
+                cache.incr(key, delta)
+            except ValueError:
+                if not cache.add(key, delta, timeout=None):
+                    cache.incr(key, delta)
+
+
+registry = Registry()
+
+
+def value_key(series, field):
+    digest = hashlib.md5(repr(series).encode()).hexdigest()
+    return VALUE_KEY.format(digest, field)
+
+
+def fields(name):
+    if name in COUNTERS:
+        return ['value']
+    buckets = HISTOGRAMS[name][1]
+    return list(range(len(buckets) + 1)) + ['sum', 'count']
+
+
+@contextmanager
+def collecting():
+    """Накапливает время именованных участков внутри запроса"""
+    _local.timings = timings = Counter()
+    try:
+        yield timings
+    finally:
+        _local.timings = None
+
+
+@contextmanager
+def measure(name):
+    timings = getattr(_local, 'timings', None)
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] += time.perf_counter() - started
+
+
+class QueryTimer:
+    """Обёртка execute_wrapper: число и время запросов к базе"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+def instrument_serializers():
+    """Засекает .data сериализаторов верхнего уровня.
+
+    Вложенные сериализаторы вызывают to_representation, а не .data,
+    поэтому время не считается дважды.
+    """
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        if getattr(cls.data.fget, 'measured', False):
+            continue
+        cls.data = measured_property(cls.data)
+
+
+def measured_property(prop):
+    def data(self):
+        with measure('serializer'):
+            return prop.fget(self)
+    data.measured = True
+    return property(data)
+
+
+def format_labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    return ','.join(
+        '{}="{}"'.format(
+            key,
+            str(value).replace('\\', r'\\').replace('"', r'\"')
+        )
+        for key, value in pairs
+    )
+
+
+def render():
+    registry.flush()
+    series = sorted(cache.get(SERIES_KEY, set()))
+    values = cache.get_many([
+        value_key(item, field)
+        for item in series for field in fields(item[0])
+    ])
+    lines = []
+    for name, help_text in COUNTERS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for item in series:
+            if item[0] == name:
+                value = values.get(value_key(item, 'value'), 0)
+                lines.append(f'{name}{{{format_labels(item[1])}}} {value}')
+    for name, (help_text, buckets, scale) in HISTOGRAMS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for item in series:
+            if item[0] != name:
+                continue
+            labels = item[1]
+            total = 0
+            for index, bound in enumerate(buckets + ('+Inf',)):
+                total += values.get(value_key(item, index), 0)
+                lines.append('{}_bucket{{{}}} {}'.format(
+                    name, format_labels(labels, le=bound), total
+                ))
+            amount = values.get(value_key(item, 'sum'), 0)
+            if scale != 1:
+                amount /= scale
+            count = values.get(value_key(item, 'count'), 0)
+            lines.append(f'{name}_sum{{{format_labels(labels)}}} {amount}')
+            lines.append(f'{name}_count{{{format_labels(labels)}}} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics(request):
+    return HttpResponse(render(),
+                        content_type='text/plain; version=0.0.4')
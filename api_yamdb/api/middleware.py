@@ -0,0 +1,160 @@
+import hashlib
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import OperationalError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+from .metrics import QueryTimer, collecting, registry
+from .querycheck import QueryInspector, get_query_budget, query_problems
+from .routers import choose_replica, get_read_database, mark_down, read_from
+
+STICKY_KEY = 'db:sticky:{}'
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsMiddleware:
+    """Время, запросы к базе и размер ответа по представлениям.
+
+    Все запросы попадают в счётчик http_requests_total, а подробные
+    замеры снимаются с доли METRICS_SAMPLE_RATE: только у них есть
+    обёртка execute_wrapper и заголовок Server-Timing.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.METRICS_SAMPLE_RATE:
+            response = self.get_response(request)
+            registry.inc('http_requests_total',
+                         self.get_labels(request, response))
+            registry.maybe_flush(settings.METRICS_FLUSH_SECONDS)
+            return response
+        queries = QueryTimer()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            with collecting() as timings:
+                response = self.get_response(request)
+        total = time.perf_counter() - started
+        labels = self.get_labels(request, response)
+        registry.inc('http_requests_total', labels)
+        registry.observe('http_request_duration_seconds', labels, total)
+        view = labels[:1]
+        registry.observe('db_queries_per_request', view, queries.count)
+        registry.observe('db_duration_seconds', view, queries.duration)
+        registry.observe('serializer_duration_seconds', view,
+                         timings['serializer'])
+        if not response.streaming:
+            registry.observe('http_response_size_bytes', view,
+                             len(response.content))
+        response['Server-Timing'] = (
+            f'total;dur={total * 1000:.1f}, '
+            f'db;dur={queries.duration * 1000:.1f};'
+            f'desc="{queries.count} queries", '
+            f'serializer;dur={timings["serializer"] * 1000:.1f}'
+        )
+        if total * 1000 >= settings.METRICS_SLOW_REQUEST_MS:
+            logger.warning('Медленный запрос %s %s: %s',
+                           request.method, request.path,
+                           response['Server-Timing'])
+        registry.maybe_flush(settings.METRICS_FLUSH_SECONDS)
+        return response
+
+    @staticmethod
+    def get_labels(request, response):
+        match = getattr(request, 'resolver_match', None)
+        return (
+            ('view', match.view_name if match else 'unknown'),
+            ('method', request.method),
+            ('status', str(response.status_code)),
+        )
+
+
+class QueryInspectorMiddleware:
+    """Ищет N+1, медленные запросы и превышение query_budget.
+
+    Включается QUERY_INSPECTOR (по умолчанию при DEBUG и в тестах):
+    находки пишутся в лог и рассылаются сигналом query_problems.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.QUERY_INSPECTOR:
+            return self.get_response(request)
+        inspector = QueryInspector()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(inspector))
+            stack.callback(self.report, request, inspector)
+            return self.get_response(request)
+
+    @staticmethod
+    def report(request, inspector):
+        problems = inspector.problems(
+            get_query_budget(request),
+            settings.QUERY_REPEAT_THRESHOLD,
+            settings.QUERY_SLOW_MS,
+        )
+        for kind, message in problems:
+            logger.warning('%s %s [%s] %s', request.method, request.path,
+                           kind, message)
+        if problems:
+            query_problems.send(sender=QueryInspectorMiddleware,
+                                request=request, problems=problems)
+
+
+class ReplicaMiddleware:
+    """Отправляет чтения API на реплики.
+
+    После успешной записи запросы с тем же токеном REPLICA_STICKY_SECONDS
+    читают из основной базы, чтобы автор сразу увидел свой отзыв.
+    Если реплика недоступна, запрос повторяется на основной базе.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not request.path.startswith('/api/'):
+            return self.get_response(request)
+        sticky_key = self.get_sticky_key(request)
+        if request.method not in SAFE_METHODS:
+            response = self.get_response(request)
+            if sticky_key is not None and response.status_code < 400:
+                cache.set(sticky_key, True,
+                          timeout=settings.REPLICA_STICKY_SECONDS)
+            return response
+        if sticky_key is not None and cache.get(sticky_key):
+            return self.get_response(request)
+        alias = choose_replica()
+        if alias is None:
+            return self.get_response(request)
+        with read_from(alias):
+            return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        alias = get_read_database()
+        if alias is None or not isinstance(exception, OperationalError):
+            return None
+        mark_down(alias)
+        with read_from(None):
+            return self.get_response(request)
+
+    @staticmethod
+    def get_sticky_key(request):
+        authorization = request.META.get('HTTP_AUTHORIZATION')
+        if not authorization:
+            return None
+        return STICKY_KEY.format(
+            hashlib.md5(authorization.encode()).hexdigest()
+        )
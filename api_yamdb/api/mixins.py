@@ -0,0 +1,165 @@
+from django.conf import settings
+from django.core.cache import cache as django_cache
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import cache, conditional
+from .pagination import cursor_requested
+from .routers import get_read_database, read_from
+from .sparse import is_sparse, prune_queryset
+
+
+class CursorPaginationMixin:
+    """Переключает вьюсет на курсорную пагинацию по запросу клиента.
+
+    По умолчанию остаётся постраничная пагинация из настроек, курсорная
+    включается параметром ``?pagination=cursor`` или ``?cursor=...``.
+    """
+    cursor_pagination_class = None
+
+    @property
+    def paginator(self):
+        if (not hasattr(self, '_paginator')
+                and self.cursor_pagination_class is not None
+                and cursor_requested(self.request)):
+            self._paginator = self.cursor_pagination_class()
+        return super().paginator
+
+
+class CachedReadMixin:
+    """Кэширует ответы на чтение для анонимных пользователей.
+
+    Ключ строится из пути, параметров запроса и версий пространств имён
+    из ``get_cache_namespaces``. Версии поднимают сигналы в ``api.signals``
+    при изменении данных, так что устаревшие ответы больше не читаются.
+    Промах кэша читает основную базу: ответ с отстающей реплики лёг бы
+    под уже поднятую версию и отдавался бы всем до истечения TTL.
+    """
+    cache_namespaces = ()
+    cached_formats = ('json', )
+
+    def get_cache_namespaces(self):
+        return self.cache_namespaces
+
+    def get_cache_versions(self):
+        """Версии кэша, которые поднимаются при изменении данных ответа"""
+        return tuple(cache.get_versions(
+            (cache.GLOBAL_NAMESPACE, *self.get_cache_namespaces())
+        ))
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        renderer_format = request.accepted_renderer.format
+        if (request.user.is_authenticated
+                or renderer_format not in self.cached_formats):
+            return handler(request, *args, **kwargs)
+        key = cache.response_key(request, self.get_cache_namespaces())
+        cached = django_cache.get(key)
+        if cached is not None:
+            content, content_type, headers = cached
+            if ('ETag' in headers
+                    and conditional.is_not_modified(request, headers['ETag'])):
+                return conditional.not_modified(headers)
+            response = HttpResponse(content, content_type=content_type)
+            for name, value in headers.items():
+                response[name] = value
+            return response
+        with read_from(None):
+            response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response.add_post_render_callback(cache.store_response(key))
+        return response
+
+
+class ConditionalReadMixin:
+    """Отвечает 304 Not Modified, не запуская сериализатор.
+
+    ETag считается по состоянию из ``get_conditional_state``: агрегатам
+    и версии произведения, которая растёт при любом изменении произведения,
+    его отзывов и комментариев. Last-Modified отдаётся для информации,
+    проверка условия идёт только по If-None-Match: дата публикации не
+    меняется при редактировании и удалении.
+
+    Состояние читается из основной базы, иначе отстающая реплика ответила
+    бы 304 на уже изменённые данные. Ответ, собранный с реплики, может
+    быть старше этого состояния, поэтому валидаторы к нему не добавляются.
+    """
+
+    def get_conditional_state(self):
+        """Возвращает пару (состояние, дата последнего изменения)"""
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        with read_from(None):
+            state, last_modified = self.get_conditional_state()
+        headers = conditional.validator_headers(
+            conditional.make_etag(request, state), last_modified
+        )
+        if conditional.is_not_modified(request, headers['ETag']):
+            return conditional.not_modified(headers)
+        response = handler(request, *args, **kwargs)
+        if (response.status_code == status.HTTP_200_OK
+                and get_read_database() is None):
+            for name, value in headers.items():
+                response[name] = value
+        return response
+
+
+class SparseFieldsetMixin:
+    """Читает из базы только колонки и связи полей из ?fields= и ?omit=.
+
+    В ``sparse_required_fields`` перечисляются поля, которые вьюсет
+    читает сам, помимо сериализатора; поля курсорной пагинации
+    добавляются автоматически.
+    """
+    sparse_required_fields = ()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not is_sparse(self.request):
+            return queryset
+        return prune_queryset(queryset, self.get_serializer(),
+                              self.get_sparse_required_fields())
+
+    def get_sparse_required_fields(self):
+        ordering = getattr(
+            getattr(self, 'cursor_pagination_class', None), 'ordering', ()
+        )
+        return list(self.sparse_required_fields) + [
+            field.lstrip('-') for field in ordering
+        ]
+
+
+class CompiledListMixin:
+    """Отдаёт список через ``compiled_serializer_class``, минуя поля DRF.
+
+    Действует для постраничных списков без ?fields= и ?omit=;
+    с курсорной пагинацией и при API_COMPILED_SERIALIZERS=False работает
+    обычный сериализатор.
+    """
+    compiled_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if (self.compiled_serializer_class is None
+                or not settings.API_COMPILED_SERIALIZERS
+                or is_sparse(request) or cursor_requested(request)):
+            return super().list(request, *args, **kwargs)
+        compiled = self.compiled_serializer_class()
+        queryset = compiled.prepare(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(compiled.serialize(queryset))
+        return self.get_paginated_response(compiled.serialize(page))
@@ -0,0 +1,20 @@
+from rest_framework.pagination import CursorPagination
+
+
+class TitleCursorPagination(CursorPagination):
+    ordering = ('id', )
+
+    def get_ordering(self, request, queryset, view):
+        # Курсор строится по уникальному id, ?ordering здесь не действует
+        return self.ordering
+
+
+class PublicationCursorPagination(CursorPagination):
+    ordering = ('pub_date', 'id')
+
+
+def cursor_requested(request):
+    """Клиент выбрал курсорную пагинацию для этого запроса"""
+    params = request.query_params
+    return (params.get('pagination') == 'cursor'
+            or CursorPagination.cursor_query_param in params)
@@ -0,0 +1,75 @@
+import re
+import time
+from collections import Counter
+
+from django.dispatch import Signal
+
+# Отправляется после запроса с превышением бюджета, повторами или
+# медленными запросами; problems — список пар (вид, описание)
+query_problems = Signal(providing_args=['request', 'problems'])
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s")
+LISTS = re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)')
+SPACES = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Форма запроса без значений: IN (1, 2, 3) и IN (4) совпадают"""
+    sql = LITERALS.sub('?', sql)
+    sql = LISTS.sub('(?)', sql)
+    return SPACES.sub(' ', sql).strip()
+
+
+class QueryInspector:
+    """Обёртка execute_wrapper, которая запоминает каждый запрос"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - started))
+
+    def repeated(self, threshold):
+        shapes = Counter(fingerprint(sql) for sql, _ in self.queries)
+        return [
+            (shape, count) for shape, count in shapes.most_common()
+            if count >= threshold
+        ]
+
+    def slow(self, threshold_ms):
+        return [
+            (sql, duration * 1000) for sql, duration in self.queries
+            if duration * 1000 >= threshold_ms
+        ]
+
+    def problems(self, budget, repeat_threshold, slow_ms):
+        found = []
+        if budget is not None and len(self.queries) > budget:
+            found.append(('budget', '{} запросов при бюджете {}'.format(
+                len(self.queries), budget
+            )))
+        for shape, count in self.repeated(repeat_threshold):
+            found.append(('repeated', f'{count} раз: {shape}'))
+        for sql, duration in self.slow(slow_ms):
+            found.append(('slow', f'{duration:.0f} мс: {sql}'))
+        return found
+
+
+def get_query_budget(request):
+    """Бюджет представления: query_budget = 3 или {'list': 4, ...}"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    view = getattr(match.func, 'cls', None) or getattr(
+        match.func, 'view_class', None
+    )
+    budget = getattr(view, 'query_budget', None)
+    if not isinstance(budget, dict):
+        return budget
+    method = request.method.lower()
+    actions = getattr(match.func, 'actions', None) or {}
+    return budget.get(actions.get(method, method))
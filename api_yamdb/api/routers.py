@@ -0,0 +1,65 @@
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+DOWN_KEY = 'db:down:{}'
+
+_local = threading.local()
+
+
+def get_read_database():
+    return getattr(_local, 'database', None)
+
+
+@contextmanager
+def read_from(alias):
+    """Направляет чтения внутри блока в базу alias; None — в основную"""
+    previous = get_read_database()
+    _local.database = alias
+    try:
+        yield
+    finally:
+        _local.database = previous
+
+
+def choose_replica():
+    """Случайная реплика из доступных или None, если таких нет"""
+    replicas = settings.DATABASE_REPLICAS
+    if not replicas:
+        return None
+    down = cache.get_many([DOWN_KEY.format(alias) for alias in replicas])
+    available = [alias for alias in replicas
+                 if DOWN_KEY.format(alias) not in down]
+    return random.choice(available) if available else None
+
+
+def mark_down(alias):
+    """Исключает реплику из выбора на REPLICA_RETRY_SECONDS"""
+    cache.set(DOWN_KEY.format(alias), True,
+              timeout=settings.REPLICA_RETRY_SECONDS)
+
+
+class ReplicaRouter:
+    """Чтения внутри read_from уходят на реплику, остальное — в основную.
+
+    Запись всегда в основную базу, даже для объектов, прочитанных
+    с реплики: иначе Django записал бы их туда, откуда они загружены.
+    """
+
+    def db_for_read(self, model, **hints):
+        return get_read_database()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
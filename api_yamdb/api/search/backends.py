@@ -0,0 +1,157 @@
+import math
+import threading
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+from django.db import connection
+from reviews.models import Comment, Review, Title
+
+from .stemmer import tokenize
+
+SEARCH_CONFIG = 'russian'
+MODELS = {
+    'title': Title,
+    'review': Review,
+    'comment': Comment,
+}
+# Поля документа и их веса: A и B в терминах PostgreSQL
+FIELDS = {
+    'title': (('name', 'A'), ('description', 'B')),
+    'review': (('text', 'A'), ),
+    'comment': (('text', 'A'), ),
+}
+FIELD_WEIGHTS = {'A': 2, 'B': 1}
+
+
+class PostgresSearchBackend:
+    """Поиск по tsvector с русским словарём.
+
+    Векторы не хранятся отдельно: их выражения проиндексированы GIN
+    в миграции 0007, и PostgreSQL обновляет индексы при каждой записи.
+    """
+
+    def vector(self, kind):
+        from django.contrib.postgres.search import SearchVector
+
+        vectors = [
+            SearchVector(field, weight=weight, config=SEARCH_CONFIG)
+            for field, weight in FIELDS[kind]
+        ]
+        combined = vectors[0]
+        for vector in vectors[1:]:
+            combined = combined + vector
+        return combined
+
+    def search(self, query, kinds, limit):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        search_query = SearchQuery(query, config=SEARCH_CONFIG)
+        hits = []
+        for kind in kinds:
+            vector = self.vector(kind)
+            hits.extend(
+                (rank, kind, pk)
+                for pk, rank in MODELS[kind].objects.annotate(
+                    document=vector,
+                    rank=SearchRank(vector, search_query),
+                ).filter(document=search_query).order_by(
+                    '-rank'
+                ).values_list('pk', 'rank')[:limit]
+            )
+        return sorted(hits, reverse=True)[:limit]
+
+    def update(self, kind, instance):
+        pass
+
+    def remove(self, kind, pk):
+        pass
+
+
+class InMemorySearchBackend:
+    """Инвертированный индекс в памяти процесса с ранжированием BM25.
+
+    Используется вне PostgreSQL, прежде всего в тестах на SQLite.
+    Строится из базы при первом поиске и дальше обновляется сигналами.
+    """
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.postings = defaultdict(dict)
+        self.documents = {}
+        self.lengths = {}
+
+    def terms(self, kind, instance):
+        terms = Counter()
+        for field, weight in FIELDS[kind]:
+            for term in tokenize(getattr(instance, field)):
+                terms[term] += FIELD_WEIGHTS[weight]
+        return terms
+
+    def load(self):
+        for kind, model in MODELS.items():
+            fields = [field for field, _ in FIELDS[kind]]
+            for instance in model.objects.only(*fields).iterator():
+                self.add((kind, instance.pk), self.terms(kind, instance))
+        self.loaded = True
+
+    def add(self, key, terms):
+        for term, frequency in terms.items():
+            self.postings[term][key] = frequency
+        self.documents[key] = tuple(terms)
+        self.lengths[key] = sum(terms.values())
+
+    def discard(self, key):
+        self.lengths.pop(key, None)
+        for term in self.documents.pop(key, ()):
+            del self.postings[term][key]
+            if not self.postings[term]:
+                del self.postings[term]
+
+    def update(self, kind, instance):
+        with self.lock:
+            if self.loaded:
+                self.discard((kind, instance.pk))
+                self.add((kind, instance.pk), self.terms(kind, instance))
+
+    def remove(self, kind, pk):
+        with self.lock:
+            if self.loaded:
+                self.discard((kind, pk))
+
+    def search(self, query, kinds, limit):
+        with self.lock:
+            if not self.loaded:
+                self.load()
+            total = len(self.lengths)
+            average = sum(self.lengths.values()) / total if total else 0
+            scores = Counter()
+            for term in set(tokenize(query)):
+                docs = self.postings.get(term, {})
+                idf = math.log(1 + (total - len(docs) + 0.5)
+                               / (len(docs) + 0.5))
+                for key, frequency in docs.items():
+                    if key[0] not in kinds:
+                        continue
+                    norm = self.k1 * (
+                        1 - self.b + self.b * self.lengths[key] / average
+                    )
+                    scores[key] += (idf * frequency * (self.k1 + 1)
+                                    / (frequency + norm))
+        return [
+            (rank, kind, pk)
+            for (kind, pk), rank in scores.most_common(limit)
+        ]
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    return InMemorySearchBackend()
+
+
+def reset_backend():
+    get_backend.cache_clear()
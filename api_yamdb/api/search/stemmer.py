@@ -0,0 +1,100 @@
+"""Стеммер Портера (Snowball) для русского языка"""
+import re
+
+VOWELS = 'аеиоуыэюя'
+WORD_RE = re.compile(r'\w+')
+
+PERFECTIVE_GERUND = (('в', 'вши', 'вшись'),
+                     ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'))
+ADJECTIVE = ((), ('ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый',
+                  'ой', 'ем', 'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому',
+                  'их', 'ых', 'ую', 'юю', 'ая', 'яя', 'ою', 'ею'))
+PARTICIPLE = (('ем', 'нн', 'вш', 'ющ', 'щ'), ('ивш', 'ывш', 'ующ'))
+REFLEXIVE = ((), ('ся', 'сь'))
+VERB = (('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но',
+         'ет', 'ют', 'ны', 'ть', 'ешь', 'нно'),
+        ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей',
+         'уй', 'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят',
+         'ует', 'уют', 'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'))
+NOUN = ((), ('а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи',
+             'ии', 'и', 'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием',
+             'ем', 'ам', 'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию',
+             'ью', 'ю', 'ия', 'ья', 'я'))
+SUPERLATIVE = ('ейше', 'ейш')
+DERIVATIONAL = ('ость', 'ост')
+
+
+def _region(word, start=0):
+    """Позиция после первой согласной, следующей за гласной"""
+    for i in range(start + 1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            return i + 1
+    return len(word)
+
+
+def _strip(word, groups):
+    """Отрезает самое длинное окончание из групп.
+
+    Окончания первой группы засчитываются, только если перед ними
+    стоит «а» или «я». Возвращает None, если окончание не найдено.
+    """
+    preceded, plain = groups
+    match = max(
+        (ending for ending in preceded + plain if word.endswith(ending)),
+        key=len,
+        default=None,
+    )
+    if match is None:
+        return None
+    stem = word[:-len(match)]
+    if match in preceded and match not in plain and not stem.endswith(
+            ('а', 'я')):
+        return None
+    return stem
+
+
+def _strip_inflection(rest):
+    stripped = _strip(rest, PERFECTIVE_GERUND)
+    if stripped is not None:
+        return stripped
+    rest = _strip(rest, REFLEXIVE) or rest
+    stripped = _strip(rest, ADJECTIVE)
+    if stripped is not None:
+        return _strip(stripped, PARTICIPLE) or stripped
+    for groups in (VERB, NOUN):
+        stripped = _strip(rest, groups)
+        if stripped is not None:
+            return stripped
+    return rest
+
+
+def _strip_superlative(rest):
+    if rest.endswith('нн'):
+        return rest[:-1]
+    for ending in SUPERLATIVE:
+        if rest.endswith(ending):
+            rest = rest[:-len(ending)]
+            return rest[:-1] if rest.endswith('нн') else rest
+    return rest[:-1] if rest.endswith('ь') else rest
+
+
+def stem(word):
+    word = word.lower().replace('ё', 'е')
+    rv = next(
+        (i + 1 for i, letter in enumerate(word) if letter in VOWELS),
+        len(word),
+    )
+    r2 = _region(word, _region(word))
+    prefix, rest = word[:rv], _strip_inflection(word[rv:])
+    if rest.endswith('и'):
+        rest = rest[:-1]
+    for ending in DERIVATIONAL:
+        if rest.endswith(ending) and len(prefix + rest) - len(ending) >= r2:
+            rest = rest[:-len(ending)]
+            break
+    return prefix + _strip_superlative(rest)
+
+
+def tokenize(text):
+    """Нормализованные основы слов текста"""
+    return [stem(word) for word in WORD_RE.findall(text or '')]
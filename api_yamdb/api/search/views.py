@@ -0,0 +1,66 @@
+from rest_framework import status
+from rest_framework.decorators import (api_view, permission_classes,
+                                       throttle_classes)
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from reviews.models import Comment, Review, Title
+
+from ..throttling import SearchRateThrottle
+from .backends import MODELS, get_backend
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+SNIPPET_LENGTH = 200
+
+
+def describe(hits):
+    """Подгружает найденные объекты одним запросом на каждый тип"""
+    ids = {kind: [pk for _, hit_kind, pk in hits if hit_kind == kind]
+           for kind in MODELS}
+    found = {}
+    for title in Title.objects.filter(pk__in=ids['title']).values(
+            'id', 'name'):
+        found['title', title['id']] = {
+            'title_id': title['id'], 'text': title['name'],
+        }
+    for review in Review.objects.filter(pk__in=ids['review']).values(
+            'id', 'title_id', 'text'):
+        found['review', review['id']] = {
+            'title_id': review['title_id'],
+            'text': review['text'][:SNIPPET_LENGTH],
+        }
+    for comment in Comment.objects.filter(pk__in=ids['comment']).values(
+            'id', 'review__title_id', 'review_id', 'text'):
+        found['comment', comment['id']] = {
+            'title_id': comment['review__title_id'],
+            'review_id': comment['review_id'],
+            'text': comment['text'][:SNIPPET_LENGTH],
+        }
+    return [
+        {'type': kind, 'id': pk, 'rank': round(rank, 4),
+         **found[kind, pk]}
+        for rank, kind, pk in hits if (kind, pk) in found
+    ]
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@throttle_classes([SearchRateThrottle])
+def api_search(request):
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response('Не задан поисковый запрос',
+                        status=status.HTTP_400_BAD_REQUEST)
+    kinds = request.query_params.get('type', ','.join(MODELS)).split(',')
+    if not set(kinds) <= set(MODELS):
+        return Response(f'Тип может быть только {", ".join(MODELS)}',
+                        status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = min(int(request.query_params.get('limit', DEFAULT_LIMIT)),
+                    MAX_LIMIT)
+    except ValueError:
+        return Response('Неверное значение limit',
+                        status=status.HTTP_400_BAD_REQUEST)
+    results = describe(get_backend().search(query, kinds, max(limit, 1)))
+    return Response({'count': len(results), 'results': results},
+                    status=status.HTTP_200_OK)
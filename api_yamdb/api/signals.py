@@ -0,0 +1,113 @@
+from django.core.signals import request_started
+from django.db import connections
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.signals import bulk_created, bulk_imported, ratings_rebuilt
+
+from . import cache
+from .authentication import reset_token_state
+from .search.backends import get_backend, reset_backend
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_categories(sender, **kwargs):
+    cache.bump('categories', 'titles')
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_genres(sender, **kwargs):
+    cache.bump('genres', 'titles')
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_titles(sender, **kwargs):
+    cache.bump('titles')
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_reviews(sender, instance, **kwargs):
+    cache.bump('titles', f'reviews:{instance.title_id}')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comments(sender, instance, **kwargs):
+    cache.bump(f'comments:{instance.review_id}')
+
+
+@receiver(bulk_created, sender=Review)
+def invalidate_bulk_reviews(sender, objects, **kwargs):
+    cache.bump('titles', *{f'reviews:{review.title_id}' for review in objects})
+
+
+@receiver(bulk_created, sender=Comment)
+def invalidate_bulk_comments(sender, objects, **kwargs):
+    cache.bump(*{f'comments:{comment.review_id}' for comment in objects})
+
+
+@receiver(ratings_rebuilt)
+def invalidate_ratings(sender, **kwargs):
+    cache.bump('titles')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_authors(sender, created=False, **kwargs):
+    if not created:
+        cache.bump('authors')
+
+
+@receiver(post_save, sender=User)
+def reset_token_state_on_save(sender, instance, created, **kwargs):
+    # Время отзыва токенов записывает User.save()
+    if not created:
+        reset_token_state(instance.pk)
+    instance.remember_claims()
+
+
+@receiver(post_delete, sender=User)
+def reset_token_state_on_delete(sender, instance, **kwargs):
+    reset_token_state(instance.pk)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+def update_search_index(sender, instance, **kwargs):
+    get_backend().update(sender._meta.model_name, instance)
+
+
+@receiver(bulk_created)
+def update_search_index_bulk(sender, objects, **kwargs):
+    backend = get_backend()
+    for instance in objects:
+        backend.update(sender._meta.model_name, instance)
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def remove_from_search_index(sender, instance, **kwargs):
+    get_backend().remove(sender._meta.model_name, instance.pk)
+
+
+@receiver(bulk_imported)
+def invalidate_everything(sender, **kwargs):
+    cache.bump(cache.GLOBAL_NAMESPACE)
+    reset_backend()
+
+
+@receiver(request_started)
+def check_persistent_connections(sender, **kwargs):
+    """Отмечает постоянные соединения для проверки при первом обращении"""
+    for connection in connections.all():
+        connection.health_check_needed = bool(
+            connection.connection is not None
+            and connection.settings_dict.get('CONN_HEALTH_CHECKS')
+        )
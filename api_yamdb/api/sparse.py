@@ -0,0 +1,87 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+from .filters import split_values
+
+
+def select_fields(request, names):
+    """Поля ответа по ?fields= и ?omit= в исходном порядке"""
+    fields = split_values(request.query_params.get('fields', ''))
+    omit = split_values(request.query_params.get('omit', ''))
+    unknown = set(fields + omit) - set(names)
+    if unknown:
+        raise serializers.ValidationError({
+            'fields': 'Нет полей: {}; доступны: {}'.format(
+                ', '.join(sorted(unknown)), ', '.join(names)
+            )
+        })
+    return [
+        name for name in names
+        if (not fields or name in fields) and name not in omit
+    ]
+
+
+def is_sparse(request):
+    return (request is not None and request.method in SAFE_METHODS
+            and ('fields' in request.query_params
+                 or 'omit' in request.query_params))
+
+
+class SparseFieldsMixin:
+    """Оставляет в ответе на чтение только поля из ?fields= без ?omit=.
+
+    Действует на сериализатор верхнего уровня: вложенные объявлены
+    без контекста запроса и отдаются целиком.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if not is_sparse(request):
+            return
+        kept = select_fields(request, list(self.fields))
+        for name in set(self.fields) - set(kept):
+            self.fields.pop(name)
+
+
+def related_columns(name, field):
+    """Колонки связанной модели, которые читает поле сериализатора"""
+    if isinstance(field, serializers.ListSerializer):
+        field = field.child
+    if isinstance(field, serializers.SlugRelatedField):
+        return [f'{name}__{field.slug_field}']
+    if isinstance(field, serializers.ModelSerializer):
+        return [f'{name}__{child.source}'
+                for child in field.fields.values()]
+    return []
+
+
+def prune_queryset(queryset, serializer, required=()):
+    """only(), select_related() и prefetch_related() под поля сериализатора.
+
+    Если поле не отображается на поле модели (source='*', свойство),
+    запрос остаётся как был.
+    """
+    meta = queryset.model._meta
+    columns, joins, prefetches = list(required), [], []
+    for name, field in serializer.fields.items():
+        source = field.source.split('.')[0]
+        try:
+            model_field = meta.get_field(source)
+        except FieldDoesNotExist:
+            return queryset
+        if model_field.many_to_many or model_field.one_to_many:
+            prefetches.append(source)
+        elif model_field.is_relation:
+            columns.append(source)
+            extra = related_columns(source, field)
+            if extra:
+                joins.append(source)
+                columns += extra
+        else:
+            columns.append(source)
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if joins:
+        queryset = queryset.select_related(*joins)
+    return queryset.prefetch_related(*prefetches).only(*columns)
@@ -0,0 +1,156 @@
+import hashlib
+import math
+
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """Скользящее окно из двух счётчиков в общем кэше.
+
+    Число запросов за последние duration секунд оценивается как счётчик
+    текущего окна плюс доля предыдущего, которая ещё попадает в интервал.
+    На запрос приходятся один incr и один get независимо от лимита,
+    а incr атомарен в Redis и memcached, поэтому счётчики общие для всех
+    воркеров и хостов.
+    """
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+
+    def __init__(self):
+        # Лимит может зависеть от пользователя и выбирается в allow_request
+        pass
+
+    def get_scope(self, request):
+        return self.scope
+
+    def allow_request(self, request, view):
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        self.rate = self.THROTTLE_RATES.get(self.get_scope(request))
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        if self.rate is None:
+            return True
+        now = self.timer()
+        window = int(now // self.duration)
+        self.elapsed = now - window * self.duration
+        self.previous = self.cache.get(f'{self.key}:{window - 1}', 0)
+        self.current = self.increment(f'{self.key}:{window}')
+        weight = 1 - self.elapsed / self.duration
+        if self.previous * weight + self.current <= self.num_requests:
+            return True
+        # Отклонённые запросы, как и в DRF, не расходуют лимит
+        self.current = self.cache.decr(f'{self.key}:{window}')
+        return False
+
+    def increment(self, key):
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Счётчик живёт два окна: текущее и следующее, где он предыдущий
+            if self.cache.add(key, 1, timeout=2 * self.duration):
+                return 1
+            return self.cache.incr(key)
+
+    def wait(self):
+        """Секунды до момента, когда следующий запрос уложится в лимит"""
+        free = self.num_requests - self.current - 1
+        if free >= 0 and self.previous:
+            ready = self.duration * (1 - free / self.previous)
+            return math.ceil(max(ready - self.elapsed, 0))
+        # В этом окне места нет: ждём следующего, где текущее станет прошлым
+        ready = self.duration * (1 - (self.num_requests - 1) / self.current)
+        return math.ceil(self.duration - self.elapsed + max(ready, 0))
+
+
+class AnonReadThrottle(SlidingWindowThrottle):
+    """Чтение без токена, по IP-адресу"""
+    scope = 'anon'
+
+    def get_cache_key(self, request, view):
+        if (request.user and request.user.is_authenticated
+                or request.method not in SAFE_METHODS):
+            return None
+        return self.cache_format % {
+            'scope': self.scope, 'ident': self.get_ident(request)
+        }
+
+
+class UserWriteThrottle(SlidingWindowThrottle):
+    """Запись с токеном, по пользователю.
+
+    Лимит для роли задаётся как write:<роль>; пустой лимит снимает
+    ограничение.
+    """
+    scope = 'write'
+
+    def get_scope(self, request):
+        role = 'admin' if request.user.is_admin else request.user.role
+        scope = f'{self.scope}:{role}'
+        return scope if scope in self.THROTTLE_RATES else self.scope
+
+    def get_cache_key(self, request, view):
+        if (not request.user or not request.user.is_authenticated
+                or request.method in SAFE_METHODS):
+            return None
+        return self.cache_format % {
+            'scope': self.scope, 'ident': request.user.pk
+        }
+
+
+class SearchRateThrottle(SlidingWindowThrottle):
+    """Поиск, по пользователю или IP-адресу"""
+    scope = 'search'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class UsernameRateThrottle(SlidingWindowThrottle):
+    """Ограничивает частоту запросов к одному username.
+
+    Срабатывает до обращения к базе; без username ключом служит IP.
+    С ``per_ip`` счётчик username свой для каждого IP-адреса, чтобы
+    чужие запросы не исчерпали лимит владельца.
+    """
+    per_ip = False
+
+    def get_cache_key(self, request, view):
+        username = request.data.get('username')
+        if not username:
+            ident = self.get_ident(request)
+        else:
+            if self.per_ip:
+                username = f'{username}:{self.get_ident(request)}'
+            ident = hashlib.md5(str(username).encode()).hexdigest()
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class IPRateThrottle(SlidingWindowThrottle):
+    """Ограничивает частоту запросов с одного IP при любом username"""
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope, 'ident': self.get_ident(request)
+        }
+
+
+class SignupRateThrottle(UsernameRateThrottle):
+    scope = 'signup'
+
+
+class SignupIPRateThrottle(IPRateThrottle):
+    scope = 'signup:ip'
+
+
+class TokenRateThrottle(UsernameRateThrottle):
+    scope = 'token'
+    per_ip = True
+
+
+class TokenIPRateThrottle(IPRateThrottle):
+    scope = 'token:ip'
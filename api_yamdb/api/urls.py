@@ -2,6 +2,9 @@ from django.urls import include, path
 from rest_framework import routers
 
 from . import views
+from .batch.views import CommentBatchView, ReviewBatchView
+from .export.views import api_export
+from .search.views import api_search
 from .users.views import UsersViewSet, api_gettoken, api_signup
 
 app_name = 'api'
@@ -23,5 +26,9 @@ router_v1.register(
 urlpatterns = [
     path('v1/auth/signup/', api_signup),
     path('v1/auth/token/', api_gettoken),
+    path('v1/search/', api_search),
+    path('v1/reviews/batch/', ReviewBatchView.as_view()),
+    path('v1/comments/batch/', CommentBatchView.as_view()),
+    path('v1/export/<slug:dataset>/', api_export),
     path('v1/', include(router_v1.urls)),
 ]
@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.utils.crypto import (constant_time_compare, get_random_string,
+                                 salted_hmac)
+from django.utils.http import base36_to_int, int_to_base36
+
+KEY_SALT = 'api.users.codes'
+
+
+def signature(user_id, email, last_login, nonce, timestamp):
+    login = last_login.timestamp() if last_login else ''
+    return salted_hmac(
+        KEY_SALT, f'{user_id}:{email}:{login}:{nonce}:{timestamp}'
+    ).hexdigest()[:20]
+
+
+def make_code(user_id, email, last_login):
+    """Код подтверждения: время выдачи, случайная соль и HMAC.
+
+    Код нигде не хранится; он перестаёт действовать через
+    CONFIRMATION_CODE_TIMEOUT секунд, при смене email или после выдачи
+    токена, которая обновляет last_login пользователя.
+    """
+    timestamp = int_to_base36(int(time.time()))
+    nonce = get_random_string(6)
+    return f'{timestamp}-{nonce}-' + signature(
+        user_id, email, last_login, nonce, timestamp
+    )
+
+
+def check_code(user_id, email, last_login, code):
+    try:
+        timestamp, nonce, mac = code.split('-')
+        issued = base36_to_int(timestamp)
+    except (AttributeError, ValueError):
+        return False
+    if time.time() - issued > settings.CONFIRMATION_CODE_TIMEOUT:
+        return False
+    return constant_time_compare(
+        mac, signature(user_id, email, last_login, nonce, timestamp)
+    )
@@ -1,8 +1,10 @@
 from rest_framework import serializers
 from reviews.models import User
 
+from ..sparse import SparseFieldsMixin
 
-class SignUpSerializer(serializers.ModelSerializer):
+
+class SignUpSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('email', 'username',)
@@ -13,7 +15,7 @@ class SignUpSerializer(serializers.ModelSerializer):
         return value
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('username', 'email', 'first_name', 'last_name',
@@ -26,7 +28,7 @@ class UserSerializer(serializers.ModelSerializer):
         return value
 
 
-class UserAdmSerializer(serializers.ModelSerializer):
+class UserAdmSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('username', 'email', 'first_name', 'last_name',
@@ -1,62 +1,93 @@
-from random import choice
-from string import ascii_lowercase
-
-from django.core.mail import send_mail
+from django.db import transaction
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import (api_view, permission_classes,
+                                       throttle_classes)
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import User
+from reviews.models import OutgoingEmail, User
 
+from ..authentication import access_token_for
+from ..mixins import SparseFieldsetMixin
 from ..permissions import IsUserAdmin
+from ..throttling import (SignupIPRateThrottle, SignupRateThrottle,
+                          TokenIPRateThrottle, TokenRateThrottle)
+from .codes import check_code, make_code
 from .serializers import SignUpSerializer, UserAdmSerializer, UserSerializer
 
 
+def send_code(user_id, email, last_login):
+    OutgoingEmail.objects.enqueue(
+        'Ваш код подтверждения для API yamdb',
+        f'Ваш код подтверждения: {make_code(user_id, email, last_login)}',
+        email,
+        'yamdb@yamdb.com',
+    )
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([SignupIPRateThrottle, SignupRateThrottle])
 def api_signup(request):
-    if request.method == 'POST':
-        email = request.data.get('email')
-        code = ''.join(choice(ascii_lowercase) for i in range(12))
-        serializer = SignUpSerializer(data=request.data)
-        if serializer.is_valid():
-            send_mail('Ваш код подтверждения для API yamdb',
-                      f'Ваш код подтверждения: {code}',
-                      'yamdb@yamdb.com',
-                      [f'{email}'])
-            serializer.save(confirmation_code=code)
-            return Response(
-                serializer.data,
-                status=status.HTTP_200_OK)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-    return Response(status=status.HTTP_400_BAD_REQUEST)
+    existing = User.objects.filter(
+        username=request.data.get('username'),
+        email=request.data.get('email'),
+    ).values_list('pk', 'last_login').first()
+    if existing is not None:
+        # Повторный запрос кода: пользователь не меняется
+        user_id, last_login = existing
+        send_code(user_id, request.data['email'], last_login)
+        return Response(
+            {'email': request.data['email'],
+             'username': request.data['username']},
+            status=status.HTTP_200_OK)
+    serializer = SignUpSerializer(data=request.data)
+    if serializer.is_valid():
+        with transaction.atomic():
+            user = serializer.save()
+            send_code(user.pk, user.email, user.last_login)
+        return Response(
+            serializer.data,
+            status=status.HTTP_200_OK)
+    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([TokenIPRateThrottle, TokenRateThrottle])
 def api_gettoken(request):
     if 'username' not in request.data:
         return Response('Неверные данные', status=status.HTTP_400_BAD_REQUEST)
     username = request.data.get('username')
-    user = get_object_or_404(User, username=username)
-    if request.data.get('confirmation_code') == user.confirmation_code:
-        refresh = RefreshToken.for_user(user)
-        return Response({'access': str(refresh.access_token), },
+    user = get_object_or_404(
+        User.objects.only('pk', 'email', 'username', 'role', 'is_superuser',
+                          'last_login'),
+        username=username
+    )
+    code = request.data.get('confirmation_code')
+    # Выдача токена меняет last_login и этим гасит код; условие на старое
+    # значение не даёт двум параллельным запросам использовать один код
+    if check_code(user.pk, user.email, user.last_login, code) and (
+        User.objects.filter(pk=user.pk, last_login=user.last_login).update(
+            last_login=timezone.now()
+        )
+    ):
+        return Response({'access': str(access_token_for(user)), },
                         status=status.HTTP_200_OK)
     return Response('Неверные данные',
                     status=status.HTTP_400_BAD_REQUEST)
 
 
-class UsersViewSet(viewsets.ModelViewSet):
+class UsersViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserAdmSerializer
     lookup_field = 'username'
     filter_backends = (DjangoFilterBackend, filters.SearchFilter)
     search_fields = ('username', )
     http_method_names = ['get', 'post', 'patch', 'delete']
+    query_budget = {'list': 2, 'retrieve': 1}
 
     def get_permissions(self):
         username = self.kwargs.get('username')
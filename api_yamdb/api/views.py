@@ -1,16 +1,28 @@
 from django.core.exceptions import PermissionDenied
-from django.db.models import Avg
+from django.db import transaction
+from django.db.models import Count, Max
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, viewsets
-from reviews.models import Category, Genre, Review, Title
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from reviews.models import Category, Comment, Genre, Ranking, Review, Title
 
 from . import serializers
-from .filters import TitleFilter
+from .compiled import (CommentCompiledSerializer, ReviewCompiledSerializer,
+                       TitleCompiledSerializer)
+from .facets import FACETS, facet_counts
+from .filters import TitleFilter, TitleOrderingFilter, split_values
+from .mixins import (CachedReadMixin, CompiledListMixin, ConditionalReadMixin,
+                     CursorPaginationMixin, SparseFieldsetMixin)
+from .pagination import PublicationCursorPagination, TitleCursorPagination
 from .permissions import IsAdminOrReadOnly, PermissionsOrReadOnly
 
 
-class CreateListDestroyViewSet(mixins.CreateModelMixin,
+class CreateListDestroyViewSet(CachedReadMixin,
+                               SparseFieldsetMixin,
+                               mixins.CreateModelMixin,
                                mixins.ListModelMixin,
                                mixins.DestroyModelMixin,
                                viewsets.GenericViewSet):
@@ -18,54 +30,163 @@ class CreateListDestroyViewSet(mixins.CreateModelMixin,
     filter_backends = (filters.SearchFilter, )
     search_fields = ('name',)
     lookup_field = 'slug'
+    query_budget = {'list': 2}
 
 
 class CategoryViewSet(CreateListDestroyViewSet):
     queryset = Category.objects.all()
     serializer_class = serializers.CategorySerializer
+    cache_namespaces = ('categories', )
 
 
 class GenreViewSet(CreateListDestroyViewSet):
     queryset = Genre.objects.all()
     serializer_class = serializers.GenreSerializer
+    cache_namespaces = ('genres', )
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all().annotate(Avg('reviews__score'))
+class TitleViewSet(CachedReadMixin, ConditionalReadMixin,
+                   CursorPaginationMixin, SparseFieldsetMixin,
+                   CompiledListMixin, viewsets.ModelViewSet):
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre').order_by('id')
     serializer_class = serializers.TitleSerializer
+    compiled_serializer_class = TitleCompiledSerializer
     permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, TitleOrderingFilter)
     filterset_class = TitleFilter
+    ordering_fields = ('rating', 'year', 'name')
+    ordering = ('id', )
+    cursor_pagination_class = TitleCursorPagination
+    cache_namespaces = ('titles', )
+    sparse_required_fields = ('version', )
+    top_max_limit = 100
+    # COUNT(*), страница, жанры и фасеты
+    query_budget = {'list': 4, 'retrieve': 2, 'top': 3}
 
     def get_serializer_class(self):
         if self.request.method in ['POST', 'PATCH']:
             return serializers.TitleCreateSerialize
         return serializers.TitleSerializer
 
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        names = self.get_facet_names()
+        if names:
+            response.data['facets'] = facet_counts(
+                TitleFilter, self.request.query_params,
+                self.get_queryset(), names
+            )
+        return response
+
+    def get_facet_names(self):
+        names = split_values(self.request.query_params.get('facets', ''))
+        unknown = set(names) - set(FACETS)
+        if unknown:
+            raise ValidationError(
+                f'Фасеты: {", ".join(FACETS)}; нет {", ".join(unknown)}'
+            )
+        return names
+
+    @action(detail=False)
+    def top(self, request):
+        """Лучшие по рейтингу: ?genre=<slug> или ?category=<slug>, ?limit="""
+        return self.cached_response(self.get_top, request)
+
+    def get_top(self, request):
+        rankings = Ranking.objects.top(
+            self.get_top_scope(), self.get_top_limit()
+        ).select_related('title__category').prefetch_related('title__genre')
+        serializer = self.get_serializer(
+            [ranking.title for ranking in rankings], many=True
+        )
+        return Response(serializer.data)
+
+    def get_top_scope(self):
+        params = self.request.query_params
+        if 'genre' in params and 'category' in params:
+            raise ValidationError('Укажите жанр или категорию, но не оба')
+        for name, model in (('genre', Genre), ('category', Category)):
+            if name in params:
+                pk = get_object_or_404(
+                    model.objects.values_list('pk', flat=True),
+                    slug=params[name]
+                )
+                return f'{name}:{pk}'
+        return 'all'
+
+    def get_top_limit(self):
+        limit = self.request.query_params.get('limit', '10')
+        if not limit.isdigit() or not 0 < int(limit) <= self.top_max_limit:
+            raise ValidationError(
+                f'limit — целое число от 1 до {self.top_max_limit}'
+            )
+        return int(limit)
+
+    def get_object(self):
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
+
+    def get_conditional_state(self):
+        if self.action == 'retrieve':
+            title = self.get_object()
+            return (title.pk, title.version), None
+        # Параметры запроса входят в ETag, а версия кэша растёт при любом
+        # изменении произведений, так что агрегат по таблице не нужен
+        return self.get_cache_versions(), None
+
+
+class ReviewViewSet(CachedReadMixin, ConditionalReadMixin,
+                    CursorPaginationMixin, SparseFieldsetMixin,
+                    CompiledListMixin, viewsets.ModelViewSet):
     serializer_class = serializers.ReviewSerializer
+    compiled_serializer_class = ReviewCompiledSerializer
     permission_classes = (PermissionsOrReadOnly, )
+    cursor_pagination_class = PublicationCursorPagination
+    query_budget = {'list': 3, 'retrieve': 2}
 
-    def get_rating(self, title):
-        score_sum = 0
-        reviews_queryset = title.reviews.all()
-        for review in reviews_queryset:
-            score_sum += review.score
-        reviews_count = len(reviews_queryset)
-        title.rating = score_sum // reviews_count
-        title.save()
+    def get_cache_namespaces(self):
+        return (f'reviews:{self.kwargs.get("title_id")}', 'authors')
 
     def perform_create(self, serializer):
         title_id = self.kwargs.get('title_id')
         title = get_object_or_404(Title, id=title_id)
-        serializer.save(author=self.request.user, title=title)
-        self.get_rating(title)
+        with transaction.atomic():
+            serializer.save(author=self.request.user, title=title)
+
+    def get_title_state(self):
+        if not hasattr(self, '_title_state'):
+            self._title_state = get_object_or_404(
+                Title.objects.annotate(
+                    last_pub_date=Max('reviews__pub_date')
+                ).values('version', 'review_count', 'last_pub_date'),
+                id=self.kwargs.get('title_id')
+            )
+        return self._title_state
+
+    def get_conditional_state(self):
+        title = self.get_title_state()
+        # Версии кэша растут и при смене username авторов в ответе
+        versions = self.get_cache_versions()
+        if self.action == 'retrieve':
+            return (title['version'], self.kwargs.get('pk'), versions), None
+        return (
+            (title['version'], title['review_count'], versions),
+            title['last_pub_date']
+        )
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        return title.reviews.select_related()
+        self.get_title_state()
+        return Review.objects.filter(
+            title_id=self.kwargs.get('title_id')
+        ).select_related().order_by('pub_date', 'id')
 
     def perform_destroy(self, instance):
         if (
@@ -73,7 +194,8 @@ class ReviewViewSet(viewsets.ModelViewSet):
             or self.request.user.is_moderator
             or self.request.user.is_admin
         ):
-            super().perform_destroy(instance)
+            with transaction.atomic():
+                super().perform_destroy(instance)
         else:
             raise PermissionDenied('Удаление чужого контента запрещено!')
 
@@ -85,9 +207,8 @@ class ReviewViewSet(viewsets.ModelViewSet):
         ):
             title_id = self.kwargs.get('title_id')
             title = get_object_or_404(Title, id=title_id)
-            serializer.save(author=self.request.user, title=title)
-            self.get_rating(title)
-            super().perform_update(serializer)
+            with transaction.atomic():
+                serializer.save(author=self.request.user, title=title)
         else:
             raise PermissionDenied('Изменение чужого контента запрещено!')
 
@@ -97,16 +218,49 @@ class ReviewViewSet(viewsets.ModelViewSet):
         return serializers.ReviewSerializer
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(CachedReadMixin, ConditionalReadMixin,
+                     CursorPaginationMixin, SparseFieldsetMixin,
+                     CompiledListMixin, viewsets.ModelViewSet):
     serializer_class = serializers.CommentSerializer
+    compiled_serializer_class = CommentCompiledSerializer
     permission_classes = (PermissionsOrReadOnly, )
+    cursor_pagination_class = PublicationCursorPagination
+    query_budget = {'list': 3, 'retrieve': 2}
+
+    def get_cache_namespaces(self):
+        return (f'comments:{self.kwargs.get("review_id")}', 'authors')
 
     def perform_create(self, serializer):
         review_id = self.kwargs.get('review_id')
         review = get_object_or_404(Review, id=review_id)
         serializer.save(author=self.request.user, review=review)
 
+    def get_review_state(self):
+        if not hasattr(self, '_review_state'):
+            self._review_state = get_object_or_404(
+                Review.objects.annotate(
+                    comment_count=Count('comments'),
+                    last_pub_date=Max('comments__pub_date')
+                ).values('title__version', 'comment_count', 'last_pub_date'),
+                id=self.kwargs.get('review_id')
+            )
+        return self._review_state
+
+    def get_conditional_state(self):
+        review = self.get_review_state()
+        versions = self.get_cache_versions()
+        if self.action == 'retrieve':
+            return (
+                (review['title__version'], self.kwargs.get('pk'), versions),
+                None
+            )
+        return (
+            (review['title__version'], review['comment_count'], versions),
+            review['last_pub_date']
+        )
+
     def get_queryset(self):
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id)
-        return review.comments.select_related()
+        self.get_review_state()
+        return Comment.objects.filter(
+            review_id=self.kwargs.get('review_id')
+        ).select_related().order_by('pub_date', 'id')
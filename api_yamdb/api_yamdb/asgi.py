@@ -1,7 +1,10 @@
 import os
 
-from django.core.asgi import get_asgi_application
+from asgiref.wsgi import WsgiToAsgi
+from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
-application = get_asgi_application()
+# В Django 2.2 нет ASGI-обработчика: WSGI-приложение выполняется
+# в пуле потоков, а соединения держит uvicorn
+application = WsgiToAsgi(get_wsgi_application())
@@ -24,6 +24,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.QueryInspectorMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -31,6 +33,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -65,11 +68,101 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default='5432')
+        'PORT': os.getenv('DB_PORT', default='5432'),
+        # Сколько секунд держать соединение между запросами; 0 — закрывать
+        # после каждого запроса
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+        # Проверять постоянное соединение перед запросом (как в Django 4.1)
+        'CONN_HEALTH_CHECKS': os.getenv(
+            'DB_CONN_HEALTH_CHECKS', default='True'
+        ) == 'True',
+        # За PgBouncer в режиме transaction курсоры WITH HOLD не работают
+        'DISABLE_SERVER_SIDE_CURSORS': os.getenv(
+            'DB_DISABLE_SERVER_SIDE_CURSORS', default='False'
+        ) == 'True',
     }
 }
 
 
+# Реплики для чтения: DB_REPLICA_HOSTS=host1:5432,host2; остальные
+# параметры подключения те же, что у основной базы
+
+DATABASE_REPLICAS = []
+
+for number, address in enumerate(
+        filter(None, os.getenv('DB_REPLICA_HOSTS', default='').split(',')),
+        start=1):
+    host, _, port = address.strip().partition(':')
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+
+# Сколько секунд после записи читать из основной базы (не меньше
+# отставания реплик) и на сколько исключать недоступную реплику
+REPLICA_STICKY_SECONDS = int(os.getenv('DB_REPLICA_STICKY_SECONDS',
+                                       default=5))
+REPLICA_RETRY_SECONDS = int(os.getenv('DB_REPLICA_RETRY_SECONDS',
+                                      default=30))
+
+
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='yamdb'),
+    }
+}
+
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', default=300))
+
+API_BATCH_SIZE = int(os.getenv('API_BATCH_SIZE', default=100))
+
+# Списки произведений, отзывов и комментариев собираются из .values()
+# без полей DRF; False возвращает обычные сериализаторы
+API_COMPILED_SERIALIZERS = os.getenv('API_COMPILED_SERIALIZERS',
+                                     default='True') == 'True'
+
+# Доля запросов с подробными замерами и заголовком Server-Timing
+# и период слива метрик воркера в общий кэш
+METRICS_SAMPLE_RATE = float(os.getenv('METRICS_SAMPLE_RATE', default=0.1))
+METRICS_FLUSH_SECONDS = int(os.getenv('METRICS_FLUSH_SECONDS', default=10))
+METRICS_SLOW_REQUEST_MS = int(os.getenv('METRICS_SLOW_REQUEST_MS',
+                                        default=1000))
+
+# Поиск N+1 и медленных запросов: форма запроса, повторённая
+# QUERY_REPEAT_THRESHOLD раз за запрос, считается N+1
+QUERY_INSPECTOR = os.getenv('QUERY_INSPECTOR', default=str(DEBUG)) == 'True'
+QUERY_REPEAT_THRESHOLD = int(os.getenv('QUERY_REPEAT_THRESHOLD', default=3))
+QUERY_SLOW_MS = int(os.getenv('QUERY_SLOW_MS', default=100))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'plain'},
+    },
+    'loggers': {
+        'api': {
+            'handlers': ['console'],
+            'level': os.getenv('API_LOG_LEVEL', default='INFO'),
+        },
+    },
+}
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -105,6 +198,11 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
+# Хеш содержимого в именах собранных файлов: nginx отдаёт их с immutable
+STATICFILES_STORAGE = os.getenv(
+    'STATICFILES_STORAGE',
+    default='django.contrib.staticfiles.storage.ManifestStaticFilesStorage',
+)
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -116,18 +214,54 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
+    ],
+
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.AnonReadThrottle',
+        'api.throttling.UserWriteThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': os.getenv('THROTTLE_ANON_RATE', default='120/min'),
+        'write': os.getenv('THROTTLE_WRITE_RATE', default='60/min'),
+        'write:moderator': os.getenv('THROTTLE_MODERATOR_WRITE_RATE',
+                                     default='300/min'),
+        'write:admin': os.getenv('THROTTLE_ADMIN_WRITE_RATE') or None,
+        'signup': os.getenv('THROTTLE_SIGNUP_RATE', default='5/min'),
+        'signup:ip': os.getenv('THROTTLE_SIGNUP_IP_RATE', default='20/min'),
+        'token': os.getenv('THROTTLE_TOKEN_RATE', default='5/min'),
+        'token:ip': os.getenv('THROTTLE_TOKEN_IP_RATE', default='20/min'),
+        'search': os.getenv('THROTTLE_SEARCH_RATE', default='30/min'),
+    },
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=0)),
 }
 
 SIMPLE_JWT = {
-    'ACCESS_TOKEN_LIFETIME': timedelta(days=10),
+    # Для смены роли и блокировки токен отзывается сразу, срок
+    # ограничивает только утёкшие токены
+    'ACCESS_TOKEN_LIFETIME': timedelta(hours=int(
+        os.getenv('JWT_ACCESS_TOKEN_HOURS', default=24)
+    )),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+CONFIRMATION_CODE_TIMEOUT = int(
+    os.getenv('CONFIRMATION_CODE_TIMEOUT', default=3600)
+)
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
@@ -0,0 +1,24 @@
+from .settings import *  # noqa: F401, F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),  # noqa: F405
+    },
+    # Та же база под другим алиасом; роутер включается в тестах
+    # через DATABASE_REPLICAS
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),  # noqa: F405
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+# Манифест появляется только после collectstatic
+STATICFILES_STORAGE = (
+    'django.contrib.staticfiles.storage.StaticFilesStorage'
+)
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+QUERY_INSPECTOR = True
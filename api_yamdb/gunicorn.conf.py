@@ -0,0 +1,39 @@
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', default='0:8000')
+
+# sync, gthread или uvicorn.workers.UvicornWorker; для uvicorn
+# приложение — api_yamdb.asgi:application
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', default='gthread')
+workers = int(os.getenv(
+    'GUNICORN_WORKERS', default=multiprocessing.cpu_count() * 2 + 1
+))
+# Потоки учитываются только gthread: пока один ждёт PostgreSQL,
+# другие обслуживают запросы того же процесса
+threads = int(os.getenv('GUNICORN_THREADS', default=4))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', default=30))
+# По SIGTERM воркеры дообслуживают запросы; docker stop ждёт 10 секунд
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', default=8))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', default=5))
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', default=1000))
+max_requests_jitter = max_requests // 10
+
+
+def on_starting(server):
+    """Не запускает несколько воркеров с кэшем в памяти процесса.
+
+    В кэше хранятся версии ответов, отозванные токены, счётчики
+    троттлинга и метрики; у каждого воркера LocMemCache был бы свой.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    from django.conf import settings
+
+    backend = settings.CACHES['default']['BACKEND']
+    if server.cfg.workers > 1 and backend.endswith('LocMemCache'):
+        raise RuntimeError(
+            f'{server.cfg.workers} воркеров с LocMemCache: укажите '
+            'CACHE_BACKEND и CACHE_LOCATION общего кэша (Redis) '
+            'или GUNICORN_WORKERS=1'
+        )
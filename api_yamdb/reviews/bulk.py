@@ -0,0 +1,54 @@
+from contextlib import contextmanager
+from itertools import islice
+
+from django.core.management.color import no_style
+from django.db import connection
+from django.db.models import Max
+
+from .models import Comment, Review
+
+
+def batched(iterable, size):
+    """Разбивает поток объектов на списки не длиннее size"""
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+def next_pk(model):
+    return (model.objects.aggregate(value=Max('pk'))['value'] or 0) + 1
+
+
+def bulk_insert(model, objects):
+    """bulk_create, после которого у всех объектов есть pk.
+
+    Бэкенды без RETURNING для пакетной вставки (SQLite) получают pk
+    заранее, поэтому вызывать нужно внутри транзакции.
+    """
+    if not connection.features.can_return_ids_from_bulk_insert:
+        for pk, obj in enumerate(objects, next_pk(model)):
+            obj.pk = pk
+    return model.objects.bulk_create(objects)
+
+
+def reset_sequences(models):
+    """Сдвигает последовательности id после вставки с явными pk"""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+@contextmanager
+def keep_pub_date():
+    """Отключает auto_now_add у дат публикации на время массовой вставки"""
+    fields = [model._meta.get_field('pub_date') for model in (Review, Comment)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
@@ -0,0 +1,128 @@
+import csv
+import io
+import json
+from collections import namedtuple
+from datetime import datetime, time, timezone
+
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Category, Comment, Genre, Review, Title, User
+
+Dataset = namedtuple('Dataset', 'name model columns references')
+Dataset.__doc__ = """Файл static/data/reviews_<name>.csv.
+
+columns сопоставляет колонки CSV атрибутам модели, references —
+колонки-ссылки моделям, на которые они указывают.
+"""
+
+DATASETS = (
+    Dataset('user', User, {
+        'id': 'id', 'username': 'username', 'email': 'email',
+        'role': 'role', 'bio': 'bio', 'first_name': 'first_name',
+        'last_name': 'last_name',
+    }, {}),
+    Dataset('category', Category, {
+        'id': 'id', 'name': 'name', 'slug': 'slug',
+    }, {}),
+    Dataset('genre', Genre, {
+        'id': 'id', 'name': 'name', 'slug': 'slug',
+    }, {}),
+    Dataset('title', Title, {
+        'id': 'id', 'name': 'name', 'year': 'year',
+        'category_id': 'category_id',
+    }, {'category_id': Category}),
+    Dataset('title_genre', Title.genre.through, {
+        'id': 'id', 'title_id': 'title_id', 'genre_id': 'genre_id',
+    }, {'title_id': Title, 'genre_id': Genre}),
+    Dataset('review', Review, {
+        'id': 'id', 'title_id': 'title_id', 'text': 'text',
+        'author': 'author_id', 'score': 'score', 'pub_date': 'pub_date',
+    }, {'title_id': Title, 'author': User}),
+    Dataset('comment', Comment, {
+        'id': 'id', 'review_id': 'review_id', 'text': 'text',
+        'author': 'author_id', 'pub_date': 'pub_date',
+    }, {'review_id': Review, 'author': User}),
+)
+
+
+def file_name(dataset):
+    return f'reviews_{dataset.name}.csv'
+
+
+def get_dataset(name):
+    for dataset in DATASETS:
+        if dataset.name == name:
+            return dataset
+    raise LookupError(name)
+
+
+def has_pub_date(dataset):
+    return 'pub_date' in dataset.columns
+
+
+def parse_since(value):
+    """Дата или момент времени ISO 8601; наивное время считается UTC"""
+    try:
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            moment = day and datetime.combine(day, time())
+    except ValueError:
+        return None
+    if moment is not None and moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment
+
+
+def iter_rows(dataset, since=None, chunk_size=2000):
+    """Построчно читает набор данных в порядке id.
+
+    ``iterator`` на PostgreSQL читает через серверный курсор, поэтому
+    память не зависит от размера таблицы.
+    """
+    queryset = dataset.model.objects.order_by('pk')
+    if since is not None:
+        queryset = queryset.filter(pub_date__gte=since)
+    return queryset.values_list(
+        *dataset.columns.values()
+    ).iterator(chunk_size=chunk_size)
+
+
+def export_value(value):
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).isoformat(
+            timespec='milliseconds'
+        ).replace('+00:00', 'Z')
+    return value
+
+
+def csv_lines(dataset, rows):
+    """Строки CSV в формате static/data, начиная с заголовка"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+
+    def line(values):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(values)
+        return buffer.getvalue()
+
+    yield line(dataset.columns)
+    for row in rows:
+        yield line(
+            '' if value is None else export_value(value) for value in row
+        )
+
+
+def ndjson_lines(dataset, rows):
+    for row in rows:
+        yield json.dumps(
+            dict(zip(dataset.columns, map(export_value, row))),
+            ensure_ascii=False,
+        ) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': (csv_lines, 'text/csv; charset=utf-8'),
+    'ndjson': (ndjson_lines, 'application/x-ndjson; charset=utf-8'),
+}
@@ -0,0 +1,56 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from .benchmark_indexes import percentile
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает задержку запроса с новым соединением на каждый '
+            'запрос (CONN_MAX_AGE = 0) и с постоянным соединением')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200)
+        parser.add_argument('--database', default='default')
+        parser.add_argument(
+            '--sql', default='SELECT 1',
+            help='Запрос, который выполняется на каждой итерации',
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        settings = connection.settings_dict
+        self.stdout.write(
+            f'{connection.vendor} {settings["HOST"]}:{settings["PORT"]}, '
+            f'CONN_MAX_AGE={settings["CONN_MAX_AGE"]}'
+        )
+        fresh = self.measure(connection, options, reconnect=True)
+        persistent = self.measure(connection, options, reconnect=False)
+        self.stdout.write('Медиана / p95 / p99, мс:')
+        for label, timings in (('новое соединение', fresh),
+                               ('постоянное', persistent)):
+            self.stdout.write(
+                f'{label:18} {statistics.median(timings):8.2f} / '
+                f'{percentile(timings, 95):8.2f} / '
+                f'{percentile(timings, 99):8.2f}'
+            )
+        overhead = statistics.median(fresh) - statistics.median(persistent)
+        self.stdout.write(self.style.SUCCESS(
+            f'Установка соединения: {overhead:.2f} мс на запрос'
+        ))
+
+    def measure(self, connection, options, reconnect):
+        connection.close()
+        timings = []
+        for _ in range(options['repeat']):
+            if reconnect:
+                connection.close()
+            started = time.perf_counter()
+            with connection.cursor() as cursor:
+                cursor.execute(options['sql'])
+                cursor.fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+        connection.close()
+        return timings
@@ -0,0 +1,123 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from reviews.models import Comment, Genre, Review, Title
+from reviews.synthetic import seed
+
+TUNED_INDEXES = (
+    'review_title_pub_date_idx',
+    'comment_review_pub_date_idx',
+    'title_genre_genre_title_idx',
+    'title_name_trgm_idx',
+)
+BASELINE_INDEXES = (
+    'CREATE INDEX bench_review_title_idx ON reviews_review (title_id)',
+    'CREATE INDEX bench_comment_review_idx ON reviews_comment (review_id)',
+)
+
+
+class Command(BaseCommand):
+    help = ('Наполняет базу синтетическими данными и сравнивает планы '
+            'и время запросов API с подобранными индексами и без них. '
+            'Все изменения откатываются по завершении.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=20000)
+        parser.add_argument('--reviews', type=int, default=200000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument('--repeat', type=int, default=30)
+        parser.add_argument(
+            '--no-explain', action='store_true',
+            help='Не выводить планы запросов',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            started = time.perf_counter()
+            created = seed(options['titles'], options['reviews'],
+                           options['comments'])
+            self.stdout.write(
+                f'Данные созданы за {time.perf_counter() - started:.1f} с'
+            )
+            queries = self.get_queries(created)
+            self.analyze()
+            tuned = self.measure(queries, options, 'С индексами')
+            with transaction.atomic():
+                self.use_baseline_indexes()
+                baseline = self.measure(queries, options, 'Без индексов')
+                transaction.set_rollback(True)
+            self.report(baseline, tuned)
+            transaction.set_rollback(True)
+
+    def get_queries(self, created):
+        title_id = Review.objects.filter(
+            pk=created['reviews'][len(created['reviews']) // 2]
+        ).values_list('title_id', flat=True).first()
+        review_id = Comment.objects.filter(
+            pk__gte=created['comments'].start
+        ).values_list('review_id', flat=True).first()
+        genre = Genre.objects.order_by('pk').values_list('slug', flat=True)
+        reviews = Review.objects.filter(title_id=title_id).order_by(
+            'pub_date', 'id'
+        )
+        return {
+            'titles?name=': Title.objects.filter(
+                name__icontains='крест'
+            ).order_by('id')[:10],
+            'titles?genre=': Title.objects.filter(
+                genre__slug=genre.last()
+            ).order_by('id')[:10],
+            'titles/{id}/reviews/': reviews[:10],
+            'titles/{id}/reviews/?cursor=': reviews.filter(
+                pub_date__gt=reviews.values('pub_date')[5:6]
+            )[:10],
+            'reviews/{id}/comments/': Comment.objects.filter(
+                review_id=review_id
+            ).order_by('pub_date', 'id')[:10],
+        }
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def use_baseline_indexes(self):
+        with connection.cursor() as cursor:
+            for name in TUNED_INDEXES:
+                cursor.execute(f'DROP INDEX IF EXISTS {name}')
+            for sql in BASELINE_INDEXES:
+                cursor.execute(sql)
+        self.analyze()
+
+    def measure(self, queries, options, label):
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        results = {}
+        for name, queryset in queries.items():
+            if not options['no_explain']:
+                self.stdout.write(f'{name}\n{queryset.explain()}\n')
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = timings
+        return results
+
+    def report(self, baseline, tuned):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            'Медиана / p95, мс: без индексов -> с индексами'
+        ))
+        for name in tuned:
+            before, after = baseline[name], tuned[name]
+            self.stdout.write(
+                f'{name:32} {statistics.median(before):8.2f} / '
+                f'{percentile(before, 95):8.2f} -> '
+                f'{statistics.median(after):8.2f} / '
+                f'{percentile(after, 95):8.2f}'
+            )
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, len(ordered) * percent // 100)]
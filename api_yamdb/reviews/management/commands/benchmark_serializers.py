@@ -0,0 +1,98 @@
+import statistics
+import time
+
+from api import renderers
+from api.compiled import (CommentCompiledSerializer, ReviewCompiledSerializer,
+                          TitleCompiledSerializer)
+from api.serializers import (CommentSerializer, ReviewSerializer,
+                             TitleSerializer)
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from reviews.models import Comment, Review, Title
+from reviews.synthetic import seed
+
+from .benchmark_indexes import percentile
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время отдачи страниц списков обычными '
+            'сериализаторами DRF и сериализаторами из .values() '
+            'с рендерером orjson. Созданные данные откатываются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=2000)
+        parser.add_argument('--reviews', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=5000)
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=30)
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            self.stdout.write(self.style.WARNING(
+                'orjson не установлен: быстрый рендерер работает как '
+                'обычный JSONRenderer'
+            ))
+        with transaction.atomic():
+            seed(options['titles'], options['reviews'], options['comments'])
+            self.report(self.get_pages(options['page_size']), options)
+            transaction.set_rollback(True)
+
+    def get_pages(self, size):
+        title_id = Review.objects.values_list('title_id', flat=True).first()
+        review_id = Comment.objects.values_list(
+            'review_id', flat=True
+        ).first()
+        return {
+            'titles/': (
+                Title.objects.select_related('category').prefetch_related(
+                    'genre'
+                ).order_by('id'),
+                TitleSerializer, TitleCompiledSerializer, size,
+            ),
+            'titles/{id}/reviews/': (
+                Review.objects.filter(title_id=title_id).select_related(
+                    'author'
+                ).order_by('pub_date', 'id'),
+                ReviewSerializer, ReviewCompiledSerializer, size,
+            ),
+            'reviews/{id}/comments/': (
+                Comment.objects.filter(review_id=review_id).select_related(
+                    'author'
+                ).order_by('pub_date', 'id'),
+                CommentSerializer, CommentCompiledSerializer, size,
+            ),
+        }
+
+    def report(self, pages, options):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            'Медиана / p95, мс: DRF -> из .values()'
+        ))
+        drf_renderer = JSONRenderer()
+        fast_renderer = renderers.FastJSONRenderer()
+        for name, (queryset, serializer, compiled_class, size) in (
+            pages.items()
+        ):
+            compiled = compiled_class()
+            before = measure(options['repeat'], lambda: drf_renderer.render(
+                serializer(queryset[:size], many=True).data
+            ))
+            after = measure(options['repeat'], lambda: fast_renderer.render(
+                compiled.serialize(compiled.prepare(queryset)[:size])
+            ))
+            self.stdout.write(
+                f'{name:24} {statistics.median(before):8.2f} / '
+                f'{percentile(before, 95):8.2f} -> '
+                f'{statistics.median(after):8.2f} / '
+                f'{percentile(after, 95):8.2f}  '
+                f'x{statistics.median(before) / statistics.median(after):.1f}'
+            )
+
+
+def measure(repeat, function):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from reviews.datasets import (DATASETS, EXPORT_FORMATS, get_dataset,
+                              has_pub_date, iter_rows, parse_since)
+
+
+class Command(BaseCommand):
+    help = ('Потоково выгружает набор данных в формате static/data '
+            '(CSV или NDJSON)')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'dataset', choices=[dataset.name for dataset in DATASETS],
+        )
+        parser.add_argument(
+            '--output', choices=list(EXPORT_FORMATS), default='csv',
+        )
+        parser.add_argument(
+            '--since',
+            help='Только отзывы и комментарии не старше этой даты',
+        )
+        parser.add_argument(
+            '--file', help='Путь к файлу; по умолчанию stdout',
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        dataset = get_dataset(options['dataset'])
+        since = options['since']
+        if since is not None:
+            if not has_pub_date(dataset):
+                raise CommandError(
+                    f'У набора {dataset.name} нет даты публикации'
+                )
+            since = parse_since(since)
+            if since is None:
+                raise CommandError('Неверный формат даты --since')
+        lines, _ = EXPORT_FORMATS[options['output']]
+        rows = iter_rows(dataset, since, options['chunk_size'])
+        if options['file'] is None:
+            for line in lines(dataset, rows):
+                self.stdout.write(line, ending='')
+            return
+        total = 0
+        with open(options['file'], 'w', encoding='utf-8',
+                  newline='') as file:
+            for total, line in enumerate(lines(dataset, rows), 1):
+                file.write(line)
+        self.stderr.write(f'{dataset.name}: записано строк {total}')
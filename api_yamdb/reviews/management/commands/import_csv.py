@@ -0,0 +1,144 @@
+import csv
+import io
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from reviews.bulk import batched, keep_pub_date, reset_sequences
+from reviews.datasets import DATASETS, file_name
+from reviews.models import Title
+from reviews.signals import bulk_imported
+
+COPY_NULL = r'\N'
+
+
+class Command(BaseCommand):
+    help = ('Загружает CSV из static/data потоково, пачками, в одной '
+            'транзакции и пересчитывает рейтинги произведений')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=os.path.join(settings.BASE_DIR, 'static', 'data'),
+            help='Каталог с файлами reviews_*.csv',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--ignore-conflicts', action='store_true',
+            help='Пропускать строки, которые уже есть в базе',
+        )
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='Вставлять через bulk_create и на PostgreSQL',
+        )
+
+    def handle(self, *args, **options):
+        use_copy = (connection.vendor == 'postgresql'
+                    and not options['no_copy']
+                    and not options['ignore_conflicts'])
+        started = time.perf_counter()
+        total = 0
+        with transaction.atomic(), keep_pub_date():
+            for dataset in DATASETS:
+                path = os.path.join(options['path'], file_name(dataset))
+                if not os.path.exists(path):
+                    self.stdout.write(f'{file_name(dataset)}: файла нет')
+                    continue
+                total += self.import_file(path, dataset, options, use_copy)
+            reset_sequences([dataset.model for dataset in DATASETS])
+            titles = Title.objects.rebuild_review_stats()
+        bulk_imported.send(sender=self.__class__)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено строк: {total} за {elapsed:.1f} с '
+            f'({total / elapsed:.0f} строк/с), '
+            f'пересчитан рейтинг {titles} произведений'
+        ))
+
+    def import_file(self, path, dataset, options, use_copy):
+        started = time.perf_counter()
+        imported = skipped = 0
+        with open(path, encoding='utf-8', newline='') as source:
+            reader = csv.DictReader(source)
+            missing = set(dataset.columns) - set(reader.fieldnames or ())
+            if missing:
+                raise CommandError(
+                    f'{file_name(dataset)}: нет колонок {", ".join(missing)}'
+                )
+            for batch in batched(reader, options['batch_size']):
+                rows = self.resolve_references(dataset, batch)
+                skipped += len(batch) - len(rows)
+                objects = [self.build(dataset, row) for row in rows]
+                if use_copy:
+                    self.copy(dataset.model, objects)
+                else:
+                    dataset.model.objects.bulk_create(
+                        objects,
+                        ignore_conflicts=options['ignore_conflicts'],
+                    )
+                imported += len(objects)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{file_name(dataset)}: {imported} строк за {elapsed:.2f} с '
+            f'({imported / elapsed:.0f} строк/с)'
+            + (f', пропущено без связанных объектов: {skipped}'
+               if skipped else '')
+        )
+        return imported
+
+    def resolve_references(self, dataset, rows):
+        """Отбрасывает строки со ссылками на несуществующие объекты.
+
+        Ссылки проверяются одним запросом на колонку для всей пачки.
+        """
+        for column, model in dataset.references.items():
+            ids = list({row[column] for row in rows if row[column]})
+            existing = set()
+            chunk = connection.ops.bulk_batch_size(['pk'], ids) or len(ids)
+            for part in batched(ids, chunk):
+                existing.update(
+                    str(pk) for pk in model.objects.filter(
+                        pk__in=part
+                    ).values_list('pk', flat=True)
+                )
+            rows = [row for row in rows
+                    if not row[column] or row[column] in existing]
+        return rows
+
+    def build(self, dataset, row):
+        values = {}
+        for column, attname in dataset.columns.items():
+            field = dataset.model._meta.get_field(attname)
+            value = row[column]
+            values[field.attname] = (
+                None if value == '' and field.null else field.to_python(value)
+            )
+        return dataset.model(**values)
+
+    def copy(self, model, objects):
+        fields = model._meta.concrete_fields
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for obj in objects:
+            writer.writerow(
+                COPY_NULL if value is None else value
+                for value in (
+                    field.get_db_prep_save(
+                        field.pre_save(obj, True), connection
+                    )
+                    for field in fields
+                )
+            )
+        buffer.seek(0)
+        table = connection.ops.quote_name(model._meta.db_table)
+        columns = ', '.join(
+            connection.ops.quote_name(field.column) for field in fields
+        )
+        with connection.cursor() as cursor:
+            cursor.cursor.copy_expert(
+                f'COPY {table} ({columns}) FROM STDIN '
+                f"WITH (FORMAT csv, NULL '{COPY_NULL}')",
+                buffer,
+            )
@@ -0,0 +1,371 @@
+import http.client
+import json
+import os
+import random
+import statistics
+import subprocess
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from itertools import count
+from urllib.parse import urlsplit
+
+from api.authentication import access_token_for
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from reviews.models import Genre, Review, Title, User
+
+from .benchmark_indexes import percentile
+
+DEFAULT_PATHS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/1/',
+    '/api/v1/titles/1/reviews/',
+    '/api/v1/titles/1/reviews/1/comments/',
+)
+# Доли запросов сценария api
+API_MIX = (
+    ('titles', 3),
+    ('titles?genre', 2),
+    ('title', 3),
+    ('reviews', 2),
+    ('comments', 2),
+    ('review create', 1),
+    ('comment create', 1),
+)
+SAMPLE_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = ('Нагружает запущенный сервер запросами к API и выводит '
+            'пропускную способность и задержки')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000')
+        parser.add_argument(
+            '--scenario', choices=('read', 'api'), default='read',
+            help='read — чтение путей --path, api — чтение, фильтры '
+                 'и создание отзывов и комментариев по данным из базы',
+        )
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='Путь для сценария read, можно указать несколько раз',
+        )
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument(
+            '--duration', type=float, default=30,
+            help='Длительность нагрузки, в секундах',
+        )
+        parser.add_argument(
+            '--requests', type=int,
+            help='Остановиться после этого числа запросов',
+        )
+        parser.add_argument('--token', help='JWT для заголовка Authorization')
+        parser.add_argument(
+            '--no-cache', action='store_true',
+            help='Добавлять к запросам уникальный параметр мимо кэша ответов',
+        )
+        parser.add_argument(
+            '--compressed', action='store_true',
+            help='Запрашивать ответы в gzip, как браузер',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Сохранить результаты в JSON')
+        parser.add_argument(
+            '--compare', help='JSON прошлого запуска для сравнения',
+        )
+        parser.add_argument(
+            '--max-regression', type=float,
+            help='Ошибка, если p95 какого-либо запроса вырос больше, '
+                 'чем на столько процентов',
+        )
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme != 'http' or not url.hostname:
+            raise CommandError('Ожидается адрес вида http://host:port')
+        self.host, self.port = url.hostname, url.port or 80
+        self.headers = {'Accept': 'application/json'}
+        if options['token']:
+            self.headers['Authorization'] = f'Bearer {options["token"]}'
+        if options['compressed']:
+            self.headers['Accept-Encoding'] = 'gzip'
+        self.no_cache = options['no_cache']
+        self.rng = random.Random(options['seed'])
+        if options['scenario'] == 'api':
+            self.plan = self.get_api_plan(options['concurrency'])
+        else:
+            self.plan = [
+                (path, self.fixed(path))
+                for path in options['paths'] or DEFAULT_PATHS
+            ]
+        self.counter = count()
+        self.limit = options['requests']
+        self.deadline = time.perf_counter() + options['duration']
+        self.lock = threading.Lock()
+        self.timings, self.statuses = defaultdict(list), Counter()
+        self.endpoint_statuses = defaultdict(Counter)
+        self.sizes, self.cache_statuses = defaultdict(list), Counter()
+
+        started = time.perf_counter()
+        workers = [threading.Thread(target=self.worker, args=(number,))
+                   for number in range(options['concurrency'])]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        results = self.get_results(time.perf_counter() - started, options)
+        self.report(results)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(results, output, ensure_ascii=False, indent=2)
+        if options['compare']:
+            self.compare(options['compare'], results,
+                         options['max_regression'])
+
+    @staticmethod
+    def fixed(path):
+        return lambda worker: ('GET', path, None)
+
+    def get_api_plan(self, concurrency):
+        """Запросы по реальным данным: id берутся из базы заранее"""
+        titles = list(Title.objects.filter(review_count__gt=0).order_by(
+            'pk'
+        ).values_list('pk', flat=True)[:SAMPLE_SIZE])
+        reviews = list(Review.objects.filter(title_id__in=titles).order_by(
+            'pk'
+        ).values_list('title_id', 'pk')[:SAMPLE_SIZE])
+        genres = list(Genre.objects.values_list('slug', flat=True))
+        if not titles or not reviews or not genres:
+            raise CommandError(
+                'Нет данных для сценария api: выполните seed_data'
+            )
+        pages = max(1, min(Title.objects.count() // 10, 100))
+        self.tokens = self.create_writers(concurrency)
+        self.written = Counter()
+        rng = self.rng
+        requests = {
+            'titles': lambda worker: (
+                'GET', f'/api/v1/titles/?page={rng.randint(1, pages)}', None
+            ),
+            'titles?genre': lambda worker: (
+                'GET', f'/api/v1/titles/?genre={rng.choice(genres)}', None
+            ),
+            'title': lambda worker: (
+                'GET', f'/api/v1/titles/{rng.choice(titles)}/', None
+            ),
+            'reviews': lambda worker: (
+                'GET', f'/api/v1/titles/{rng.choice(titles)}/reviews/', None
+            ),
+            'comments': lambda worker: (
+                'GET', '/api/v1/titles/{}/reviews/{}/comments/'.format(
+                    *rng.choice(reviews)
+                ), None
+            ),
+            'review create': lambda worker: self.create_review(worker,
+                                                               titles),
+            'comment create': lambda worker: (
+                'POST', '/api/v1/titles/{}/reviews/{}/comments/'.format(
+                    *rng.choice(reviews)
+                ), {'text': 'Комментарий нагрузочного теста'}
+            ),
+        }
+        plan = [
+            (name, requests[name])
+            for name, weight in API_MIX for _ in range(weight)
+        ]
+        rng.shuffle(plan)
+        return plan
+
+    def create_writers(self, number):
+        """Свежие пользователи: у каждого потока свой автор отзывов"""
+        run = uuid.uuid4().hex[:8]
+        users = User.objects.bulk_create(
+            User(username=f'loadtest-{run}-{index}',
+                 email=f'loadtest-{run}-{index}@yamdb.fake')
+            for index in range(number)
+        )
+        if users[0].pk is None:
+            users = User.objects.filter(
+                username__startswith=f'loadtest-{run}-'
+            ).order_by('pk')
+        return [str(access_token_for(user)) for user in users]
+
+    def create_review(self, worker, titles):
+        # Автор может оставить один отзыв на произведение, поэтому каждый
+        # поток идёт по произведениям по порядку
+        position = self.written[worker]
+        self.written[worker] += 1
+        title = titles[position % len(titles)]
+        return ('POST', f'/api/v1/titles/{title}/reviews/',
+                {'text': 'Отзыв нагрузочного теста', 'score': 7})
+
+    def next_request(self, worker):
+        number = next(self.counter)
+        if self.limit is not None and number >= self.limit:
+            return None
+        if time.perf_counter() > self.deadline:
+            return None
+        name, build = self.plan[number % len(self.plan)]
+        method, path, body = build(worker)
+        if self.no_cache and method == 'GET':
+            path += ('&' if '?' in path else '?') + f'nocache={number}'
+        return name, method, path, body
+
+    def worker(self, number):
+        connection = http.client.HTTPConnection(self.host, self.port,
+                                                timeout=30)
+        timings, statuses = defaultdict(list), defaultdict(Counter)
+        sizes, cache_statuses = defaultdict(list), Counter()
+        request = self.next_request(number)
+        while request is not None:
+            name, method, path, body = request
+            headers = dict(self.headers)
+            if body is not None:
+                body = json.dumps(body)
+                headers['Content-Type'] = 'application/json'
+                headers['Authorization'] = f'Bearer {self.tokens[number]}'
+            started = time.perf_counter()
+            try:
+                connection.request(method, path, body, headers=headers)
+                response = connection.getresponse()
+                sizes[name].append(len(response.read()))
+                statuses[name][response.status] += 1
+                # Заголовок микрокэша nginx
+                cache_status = response.getheader('X-Cache-Status')
+                if cache_status:
+                    cache_statuses[cache_status] += 1
+            except (OSError, http.client.HTTPException) as error:
+                statuses[name][type(error).__name__] += 1
+                connection.close()
+            timings[name].append((time.perf_counter() - started) * 1000)
+            request = self.next_request(number)
+        connection.close()
+        with self.lock:
+            for name in timings:
+                self.timings[name].extend(timings[name])
+                self.endpoint_statuses[name].update(statuses[name])
+                self.sizes[name].extend(sizes[name])
+            self.cache_statuses.update(cache_statuses)
+
+    def get_results(self, elapsed, options):
+        everything = [
+            timing for timings in self.timings.values() for timing in timings
+        ]
+        if not everything:
+            raise CommandError('Не выполнено ни одного запроса')
+        statuses = Counter()
+        for counter in self.endpoint_statuses.values():
+            statuses.update(counter)
+        return {
+            'commit': get_commit(),
+            'created': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'scenario': options['scenario'],
+            'concurrency': options['concurrency'],
+            'elapsed': round(elapsed, 3),
+            'total': summarize(everything, statuses, elapsed),
+            'endpoints': {
+                name: dict(
+                    summarize(self.timings[name],
+                              self.endpoint_statuses[name], elapsed),
+                    bytes=round(statistics.mean(self.sizes[name] or [0])),
+                )
+                for name in sorted(self.timings)
+            },
+            'cache': dict(sorted(self.cache_statuses.items())),
+        }
+
+    def report(self, results):
+        total = results['total']
+        self.stdout.write(
+            f'Запросов: {total["requests"]} за {results["elapsed"]:.1f} с, '
+            f'{total["rps"]:.1f} запросов/с'
+        )
+        self.stdout.write(
+            f'Задержка, мс: p50 {total["p50"]:.1f}, '
+            f'p95 {total["p95"]:.1f}, '
+            f'p99 {total["p99"]:.1f}, '
+            f'max {total["max"]:.1f}'
+        )
+        self.stdout.write('Ответы: ' + ', '.join(
+            f'{status}: {number}'
+            for status, number in total['statuses'].items()
+        ))
+        if results['cache']:
+            self.stdout.write('Кэш nginx: ' + ', '.join(
+                f'{status}: {number}'
+                for status, number in results['cache'].items()
+            ))
+        if len(results['endpoints']) < 2:
+            return
+        for name, endpoint in results['endpoints'].items():
+            self.stdout.write(
+                f'  {name:40} {endpoint["rps"]:8.1f}/с  '
+                f'p50 {endpoint["p50"]:7.1f}  p95 {endpoint["p95"]:7.1f}  '
+                f'p99 {endpoint["p99"]:7.1f}  {endpoint["bytes"]} байт'
+            )
+
+    def compare(self, path, results, max_regression):
+        with open(path, encoding='utf-8') as source:
+            baseline = json.load(source)
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'Сравнение с {baseline.get("commit") or path}: p95, мс и '
+            'запросов/с'
+        ))
+        regressions = []
+        current = dict(results['endpoints'], total=results['total'])
+        previous = dict(baseline['endpoints'], total=baseline['total'])
+        for name, after in current.items():
+            before = previous.get(name)
+            if before is None:
+                continue
+            change = change_percent(before['p95'], after['p95'])
+            self.stdout.write(
+                f'  {name:40} {before["p95"]:7.1f} -> {after["p95"]:7.1f} '
+                f'({change:+.0f}%)  {before["rps"]:.1f} -> '
+                f'{after["rps"]:.1f}/с'
+            )
+            if max_regression is not None and change > max_regression:
+                regressions.append(name)
+        if regressions:
+            raise CommandError(
+                f'p95 вырос больше чем на {max_regression}%: '
+                + ', '.join(regressions)
+            )
+
+
+def summarize(timings, statuses, elapsed):
+    return {
+        'requests': len(timings),
+        'rps': round(len(timings) / elapsed, 1),
+        'p50': round(statistics.median(timings), 2),
+        'p95': round(percentile(timings, 95), 2),
+        'p99': round(percentile(timings, 99), 2),
+        'max': round(max(timings), 2),
+        'statuses': {
+            str(status): number
+            for status, number in sorted(statuses.items(), key=str)
+        },
+    }
+
+
+def change_percent(before, after):
+    if not before:
+        return 0.0
+    return (after - before) / before * 100
+
+
+def get_commit():
+    """Коммит для сравнения запусков: GIT_COMMIT или git rev-parse"""
+    if os.getenv('GIT_COMMIT'):
+        return os.getenv('GIT_COMMIT')
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from reviews.models import Ranking, Title
+from reviews.signals import ratings_rebuilt
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает количество отзывов, сумму оценок и рейтинг '
+            'произведений, собирает таблицу лидеров и проверяет агрегаты '
+            'на расхождение с отзывами')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить расхождения, ничего не изменяя',
+        )
+
+    def handle(self, *args, **options):
+        drift = list(
+            Title.objects.with_review_drift().values_list(
+                'pk', 'review_count', 'score_sum',
+                'actual_review_count', 'actual_score_sum',
+            )
+        )
+        for pk, count, total, actual_count, actual_total in drift:
+            self.stdout.write(
+                f'Произведение {pk}: отзывов {count} (в базе '
+                f'{actual_count}), сумма оценок {total} (в базе '
+                f'{actual_total})'
+            )
+        if options['check']:
+            if drift:
+                raise CommandError(
+                    f'Найдены расхождения у {len(drift)} произведений'
+                )
+            self.stdout.write(self.style.SUCCESS('Расхождений нет'))
+            return
+        with transaction.atomic():
+            updated = Title.objects.rebuild_review_stats()
+            Ranking.objects.rebuild()
+            ratings_rebuilt.send(sender=self.__class__)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано произведений: {updated}, '
+            f'исправлено расхождений: {len(drift)}'
+        ))
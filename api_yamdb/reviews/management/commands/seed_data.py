@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from reviews.bulk import reset_sequences
+from reviews.models import Comment, Review, Title, User
+from reviews.signals import bulk_imported
+from reviews.synthetic import seed
+
+
+class Command(BaseCommand):
+    help = ('Наполняет базу синтетическими данными в форме static/data '
+            'для нагрузочного теста')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора: одинаковые параметры дают те же данные',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with transaction.atomic():
+            created = seed(options['titles'], options['reviews'],
+                           options['comments'], options['batch_size'],
+                           options['seed'])
+            reset_sequences([User, Title, Title.genre.through,
+                             Review, Comment])
+        bulk_imported.send(sender=self.__class__)
+        self.stdout.write(self.style.SUCCESS(
+            'Создано произведений: {}, отзывов: {}, комментариев: {} '
+            'за {:.1f} с'.format(
+                len(created['titles']), len(created['reviews']),
+                len(created['comments']), time.perf_counter() - started
+            )
+        ))
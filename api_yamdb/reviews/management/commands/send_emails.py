@@ -0,0 +1,82 @@
+import json
+import smtplib
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand, CommandError
+from reviews.models import OutgoingEmail
+from reviews.outbox import DEFAULT_LEASE, retry_delay, send_batch
+
+
+class Command(BaseCommand):
+    help = ('Отправляет письма из очереди пачками через одно '
+            'соединение, с повторами и экспоненциальной паузой')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--max-attempts', type=int, default=5)
+        parser.add_argument(
+            '--backoff', type=int, default=30,
+            help='Пауза в секундах после первой неудачной попытки',
+        )
+        parser.add_argument(
+            '--lease', type=int, default=DEFAULT_LEASE,
+            help='Через сколько секунд письмо, взятое упавшим воркером, '
+                 'можно отправить снова',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Как часто проверять пустую очередь, в секундах',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Отправить готовые письма и выйти',
+        )
+        parser.add_argument(
+            '--stats', action='store_true',
+            help='Вывести глубину очереди в JSON и выйти',
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.stdout.write(json.dumps(OutgoingEmail.objects.stats()))
+            return
+        connection = get_connection()
+        outages = 0
+        try:
+            while True:
+                try:
+                    sent, failed = send_batch(
+                        connection, options['batch_size'],
+                        options['max_attempts'], options['backoff'],
+                        options['lease'],
+                    )
+                except (smtplib.SMTPException, OSError) as error:
+                    connection.close()
+                    if options['once']:
+                        raise CommandError(
+                            f'SMTP-сервер недоступен: {error!r}'
+                        )
+                    outages += 1
+                    delay = retry_delay(outages, options['backoff'])
+                    self.stderr.write(
+                        f'SMTP-сервер недоступен: {error!r}, повтор через '
+                        f'{delay.total_seconds():.0f} с'
+                    )
+                    time.sleep(delay.total_seconds())
+                    continue
+                outages = 0
+                if sent or failed:
+                    self.stdout.write(
+                        f'Отправлено писем: {sent}, ошибок: {failed}'
+                    )
+                    continue
+                # SMTP-сервер закрывает простаивающие соединения
+                connection.close()
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
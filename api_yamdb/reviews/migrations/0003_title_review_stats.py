@@ -0,0 +1,48 @@
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_review_stats(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    Title.objects.update(
+        review_count=Coalesce(Subquery(
+            reviews.annotate(value=Count('pk')).values('value'),
+            output_field=models.IntegerField(),
+        ), 0),
+        score_sum=Coalesce(Subquery(
+            reviews.annotate(value=Sum('score')).values('value'),
+            output_field=models.IntegerField(),
+        ), 0),
+    )
+    Title.objects.update(rating=models.Case(
+        models.When(review_count__gt=0,
+                    then=F('score_sum') / F('review_count')),
+        default=None,
+        output_field=models.IntegerField(),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_auto_20220504_2028'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество отзывов'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_review_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+TITLE_GENRE_INDEX = (
+    'CREATE INDEX title_genre_genre_title_idx '
+    'ON reviews_title_genre (genre_id, title_id)'
+)
+TITLE_NAME_TRIGRAM_INDEX = (
+    'CREATE INDEX title_name_trgm_idx ON reviews_title '
+    'USING gin (UPPER(name::text) gin_trgm_ops)'
+)
+
+
+def create_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(TITLE_NAME_TRIGRAM_INDEX)
+
+
+def drop_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS title_name_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_publication_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='review',
+            name='title',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='reviews.Title'),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='review',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='reviews.Review'),
+        ),
+        migrations.RunSQL(
+            TITLE_GENRE_INDEX,
+            'DROP INDEX title_genre_genre_title_idx',
+        ),
+        migrations.RunPython(create_postgres_indexes, drop_postgres_indexes),
+    ]
@@ -0,0 +1,50 @@
+from django.db import migrations
+
+# Выражения совпадают с SQL, который строит SearchVector в
+# api.search.backends, иначе планировщик не возьмёт индекс.
+SEARCH_INDEXES = {
+    'title_search_idx': (
+        'reviews_title',
+        "setweight(to_tsvector('russian'::regconfig, "
+        "COALESCE(name, '')), 'A') || "
+        "setweight(to_tsvector('russian'::regconfig, "
+        "COALESCE(description, '')), 'B')",
+    ),
+    'review_search_idx': (
+        'reviews_review',
+        "setweight(to_tsvector('russian'::regconfig, "
+        "COALESCE(text, '')), 'A')",
+    ),
+    'comment_search_idx': (
+        'reviews_comment',
+        "setweight(to_tsvector('russian'::regconfig, "
+        "COALESCE(text, '')), 'A')",
+    ),
+}
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, (table, expression) in SEARCH_INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX {name} ON {table} USING gin (({expression}))'
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in SEARCH_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_rankings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Ranking = apps.get_model('reviews', 'Ranking')
+    genres = {}
+    for title_id, genre_id in Title.genre.through.objects.values_list(
+        'title_id', 'genre_id'
+    ):
+        genres.setdefault(title_id, []).append(genre_id)
+    rankings = []
+    for pk, category_id, rating, review_count in Title.objects.values_list(
+        'pk', 'category_id', 'rating', 'review_count'
+    ):
+        scopes = ['all'] + [f'genre:{genre_id}'
+                            for genre_id in genres.get(pk, ())]
+        if category_id is not None:
+            scopes.append(f'category:{category_id}')
+        rankings += [
+            Ranking(scope=scope, title_id=pk, rating=rating,
+                    review_count=review_count)
+            for scope in scopes
+        ]
+    Ranking.objects.bulk_create(rankings, batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_remove_user_confirmation_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Ranking',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=50)),
+                ('rating', models.IntegerField(blank=True, null=True)),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.Title')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='ranking',
+            index=models.Index(fields=['scope', '-rating', '-review_count', 'title'], name='ranking_scope_top_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='ranking',
+            constraint=models.UniqueConstraint(fields=('scope', 'title'), name='unique scope-title'),
+        ),
+        migrations.RunPython(fill_rankings, migrations.RunPython.noop),
+    ]
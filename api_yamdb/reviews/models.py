@@ -1,8 +1,12 @@
+from collections import defaultdict
 from datetime import datetime
 
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Count, F, Min, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 ROLE_CHOICES = [
     ('moderator', 'Модератор'),
@@ -10,6 +14,9 @@ ROLE_CHOICES = [
     ('user', 'Авторизованный пользователь'),
 ]
 
+# Поля пользователя, от которых зависят claims выданных токенов
+TOKEN_CLAIM_FIELDS = ('username', 'role', 'is_superuser', 'is_active')
+
 
 class User(AbstractUser):
 
@@ -25,8 +32,6 @@ class User(AbstractUser):
         blank=False,
         null=False
     )
-    confirmation_code = models.CharField(verbose_name='Код подтверждения',
-                                         max_length=100)
     bio = models.TextField(verbose_name='Биография', blank=True)
     role = models.CharField(
         verbose_name='Роль',
@@ -34,10 +39,50 @@ class User(AbstractUser):
         default='user',
         choices=ROLE_CHOICES
     )
+    tokens_valid_after = models.DateTimeField(
+        verbose_name='Токены, выданные раньше, отозваны',
+        blank=True,
+        null=True,
+        editable=False
+    )
 
     def __str__(self):
         return self.username
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not kwargs.get('force_insert'):
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                update_fields = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key
+                ]
+            # Устаревший экземпляр не должен отменить чужой отзыв токенов
+            update_fields = [name for name in update_fields
+                             if name != 'tokens_valid_after']
+            if self.claims_changed():
+                self.tokens_valid_after = timezone.now()
+                update_fields.append('tokens_valid_after')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_claims()
+        return instance
+
+    def remember_claims(self):
+        """Запоминает сохранённые в базе поля, которые попадают в JWT"""
+        self._claims_state = tuple(
+            self.__dict__.get(field) for field in TOKEN_CLAIM_FIELDS
+        )
+
+    def claims_changed(self):
+        return getattr(self, '_claims_state', None) != tuple(
+            self.__dict__.get(field) for field in TOKEN_CLAIM_FIELDS
+        )
+
     @property
     def is_admin(self):
         return self.role == 'admin' or self.is_superuser
@@ -63,6 +108,79 @@ class Genre(models.Model):
         return self.name
 
 
+class TitleQuerySet(models.QuerySet):
+
+    def apply_review_delta(self, count, score, rank=True):
+        """Сдвигает агрегаты оценок одним UPDATE, без чтения отзывов.
+
+        С rank=False таблицу лидеров обновляет вызывающий, одним запросом
+        для всех затронутых произведений.
+        """
+        review_count = F('review_count') + count
+        score_sum = F('score_sum') + score
+        updated = self.update(
+            review_count=review_count,
+            score_sum=score_sum,
+            version=F('version') + 1,
+            rating=models.Case(
+                models.When(review_count__gt=-count,
+                            then=score_sum / review_count),
+                default=None,
+                output_field=models.IntegerField(),
+            ),
+        )
+        if updated and rank:
+            self.sync_rankings()
+        return updated
+
+    def sync_rankings(self):
+        """Переносит рейтинг этих произведений в таблицу лидеров"""
+        titles = Title.objects.filter(pk=OuterRef('title_id'))
+        return Ranking.objects.filter(title__in=self.values('pk')).update(
+            rating=Subquery(titles.values('rating')),
+            review_count=Subquery(titles.values('review_count')),
+        )
+
+    def bump_version(self):
+        """Отмечает изменение произведения, его отзывов или комментариев"""
+        return self.update(version=F('version') + 1)
+
+    def with_actual_review_stats(self):
+        stats = actual_review_stats()
+        return self.annotate(
+            actual_review_count=stats['review_count'],
+            actual_score_sum=stats['score_sum'],
+        )
+
+    def with_review_drift(self):
+        return self.with_actual_review_stats().exclude(
+            review_count=F('actual_review_count'),
+            score_sum=F('actual_score_sum'),
+        )
+
+    def rebuild_review_stats(self):
+        """Пересчитывает агрегаты оценок из таблицы отзывов"""
+        self.update(**actual_review_stats())
+        return self.apply_review_delta(0, 0)
+
+
+def actual_review_stats():
+    """Коррелированные подзапросы с количеством и суммой оценок отзывов"""
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    return {
+        'review_count': Coalesce(Subquery(
+            reviews.annotate(value=Count('pk')).values('value'),
+            output_field=models.IntegerField(),
+        ), 0),
+        'score_sum': Coalesce(Subquery(
+            reviews.annotate(value=Sum('score')).values('value'),
+            output_field=models.IntegerField(),
+        ), 0),
+    }
+
+
 class Title(models.Model):
     name = models.CharField(max_length=300,)
     year = models.PositiveSmallIntegerField(
@@ -75,6 +193,21 @@ class Title(models.Model):
     description = models.TextField(max_length=256)
     genre = models.ManyToManyField(Genre)
     rating = models.IntegerField(blank=True, null=True)
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+        editable=False
+    )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False
+    )
+    version = models.PositiveIntegerField(
+        verbose_name='Версия',
+        default=0,
+        editable=False
+    )
     category = models.ForeignKey(
         Category,
         on_delete=models.SET_NULL,
@@ -83,16 +216,118 @@ class Title(models.Model):
         related_name='titles',
     )
 
+    objects = TitleQuerySet.as_manager()
+
+    # Пишутся только сдвигами через TitleQuerySet; save() их не трогает,
+    # иначе устаревший экземпляр затрёт агрегаты
+    aggregate_fields = ('rating', 'review_count', 'score_sum', 'version')
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not kwargs.get('force_insert'):
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                update_fields = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key
+                ]
+            kwargs['update_fields'] = [
+                name for name in update_fields
+                if name not in self.aggregate_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+def ranking_scopes(category_id, genre_ids):
+    """Разделы таблицы лидеров, в которые попадает произведение"""
+    scopes = ['all']
+    if category_id is not None:
+        scopes.append(f'category:{category_id}')
+    scopes += [f'genre:{genre_id}' for genre_id in genre_ids]
+    return scopes
+
+
+class RankingQuerySet(models.QuerySet):
+
+    def top(self, scope, limit):
+        """Первые limit произведений раздела: проход по индексу"""
+        return self.filter(scope=scope, rating__isnull=False).order_by(
+            '-rating', '-review_count', 'title_id'
+        )[:limit]
+
+    def rebuild(self, title_ids=None, batch_size=5000):
+        """Заново раскладывает произведения по разделам.
+
+        Без title_ids пересобирает всю таблицу пачками по batch_size.
+        """
+        titles = Title.objects.order_by('pk')
+        rankings = self.model.objects.all()
+        if title_ids is not None:
+            titles = titles.filter(pk__in=title_ids)
+            rankings = rankings.filter(title_id__in=title_ids)
+        rankings.delete()
+        rows = titles.values_list('pk', 'category_id', 'rating',
+                                  'review_count')
+        last_pk = 0
+        batch = list(rows.filter(pk__gt=last_pk)[:batch_size])
+        while batch:
+            genres = defaultdict(list)
+            for title_id, genre_id in Title.genre.through.objects.filter(
+                title_id__in=[row[0] for row in batch]
+            ).values_list('title_id', 'genre_id'):
+                genres[title_id].append(genre_id)
+            self.model.objects.bulk_create(
+                self.model(scope=scope, title_id=pk, rating=rating,
+                           review_count=review_count)
+                for pk, category_id, rating, review_count in batch
+                for scope in ranking_scopes(category_id, genres[pk])
+            )
+            last_pk = batch[-1][0]
+            batch = list(rows.filter(pk__gt=last_pk)[:batch_size])
+
+
+class Ranking(models.Model):
+    """Таблица лидеров: рейтинг произведения в каждом его разделе.
+
+    Раздел — all, category:<id> или genre:<id>; рейтинг обновляется вместе
+    с агрегатами отзывов, поэтому первые N произведений раздела читаются
+    по индексу без сортировки всей таблицы.
+    """
+    scope = models.CharField(max_length=50)
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='rankings',
+    )
+    rating = models.IntegerField(blank=True, null=True)
+    review_count = models.PositiveIntegerField(default=0)
+
+    objects = RankingQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'title'],
+                                    name='unique scope-title')
+        ]
+        indexes = [
+            models.Index(fields=['scope', '-rating', '-review_count',
+                                 'title'],
+                         name='ranking_scope_top_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.scope}: {self.title_id}'
+
 
 class Review(models.Model):
     """Модель для создания отзыва на произведение"""
     title = models.ForeignKey(
         'Title',
         on_delete=models.CASCADE,
-        related_name='reviews'
+        related_name='reviews',
+        db_index=False
     )
     text = models.TextField(
         'Текст отзыва',
@@ -118,17 +353,35 @@ class Review(models.Model):
             models.UniqueConstraint(fields=['title', 'author'],
                                     name='unique title-author')
         ]
+        indexes = [
+            models.Index(fields=['title', 'pub_date', 'id'],
+                         name='review_title_pub_date_idx'),
+        ]
 
     def __str__(self):
         return self.text
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_rating_state()
+        return instance
+
+    def remember_rating_state(self):
+        """Запоминает сохранённые в базе произведение и оценку"""
+        self._rating_state = (
+            self.__dict__.get('title_id'),
+            self.__dict__.get('score'),
+        )
+
 
 class Comment(models.Model):
     """Модель для создания комментариев под отзывом"""
     review = models.ForeignKey(
         'Review',
         on_delete=models.CASCADE,
-        related_name='comments'
+        related_name='comments',
+        db_index=False
     )
     author = models.ForeignKey(
         User,
@@ -143,5 +396,80 @@ class Comment(models.Model):
         auto_now_add=True
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['review', 'pub_date', 'id'],
+                         name='comment_review_pub_date_idx'),
+        ]
+
     def __str__(self):
         return self.text
+
+
+EMAIL_STATUS_CHOICES = [
+    ('pending', 'Ожидает отправки'),
+    ('sent', 'Отправлено'),
+    ('failed', 'Не удалось отправить'),
+]
+
+
+class OutgoingEmailQuerySet(models.QuerySet):
+
+    def enqueue(self, subject, body, to, from_email=None):
+        """Ставит письмо в очередь; отправляет его команда send_emails"""
+        return self.create(subject=subject, body=body, to=to,
+                           from_email=from_email or '')
+
+    def due(self, now=None):
+        return self.filter(
+            status='pending', next_attempt_at__lte=now or timezone.now()
+        ).order_by('next_attempt_at', 'id')
+
+    def stats(self, now=None):
+        """Глубина очереди: ожидающие, из них готовые к отправке, ошибки"""
+        now = now or timezone.now()
+        stats = self.aggregate(
+            pending=Count('pk', filter=Q(status='pending')),
+            due=Count('pk', filter=Q(status='pending',
+                                     next_attempt_at__lte=now)),
+            failed=Count('pk', filter=Q(status='failed')),
+            oldest=Min('created', filter=Q(status='pending')),
+        )
+        oldest = stats.pop('oldest')
+        stats['oldest_age'] = (
+            (now - oldest).total_seconds() if oldest else 0
+        )
+        return stats
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку"""
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.CharField('Отправитель', max_length=254, blank=True)
+    to = models.EmailField('Получатель')
+    status = models.CharField(
+        'Статус',
+        max_length=10,
+        default='pending',
+        choices=EMAIL_STATUS_CHOICES
+    )
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка',
+        default=timezone.now
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', blank=True, null=True)
+
+    objects = OutgoingEmailQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'],
+                         name='outgoing_email_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.to}: {self.subject}'
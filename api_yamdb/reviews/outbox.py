@@ -0,0 +1,96 @@
+import smtplib
+from datetime import timedelta
+
+from django.core.mail import EmailMessage
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+MAX_BACKOFF = 3600
+# Сколько секунд письмо закреплено за воркером, который его отправляет
+DEFAULT_LEASE = 300
+
+
+def retry_delay(attempts, backoff):
+    """Экспоненциальная пауза перед следующей попыткой, не больше часа"""
+    return timedelta(seconds=min(backoff * 2 ** (attempts - 1), MAX_BACKOFF))
+
+
+def claim_batch(batch_size, lease):
+    """Забирает пачку готовых писем в аренду на lease секунд.
+
+    Строки блокируются с SKIP LOCKED только на время короткой транзакции:
+    следующая попытка переносится на конец аренды, поэтому другие воркеры
+    их не видят, а письма упавшего воркера отправятся после её истечения.
+    """
+    with transaction.atomic():
+        emails = list(OutgoingEmail.objects.due().select_for_update(
+            skip_locked=True
+        )[:batch_size])
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(
+            attempts=F('attempts') + 1,
+            next_attempt_at=timezone.now() + timedelta(seconds=lease),
+        )
+    for email in emails:
+        email.attempts += 1
+    return emails
+
+
+def release(emails, delay):
+    """Возвращает взятые письма в очередь через delay, не считая попытку"""
+    OutgoingEmail.objects.filter(
+        pk__in=[email.pk for email in emails]
+    ).update(
+        attempts=F('attempts') - 1,
+        next_attempt_at=timezone.now() + delay,
+    )
+
+
+def send_batch(connection, batch_size, max_attempts, backoff,
+               lease=DEFAULT_LEASE):
+    """Отправляет пачку готовых писем через одно соединение.
+
+    Письма отправляются вне транзакции, результат каждого сохраняется
+    сразу, так что ошибка на одном письме не приводит к повторной
+    отправке остальных. Если соединение не открывается, письма
+    возвращаются в очередь после паузы, а ошибка пробрасывается.
+    Возвращает количество отправленных писем и ошибок.
+    """
+    sent = failed = 0
+    claimed = claim_batch(batch_size, lease)
+    if not claimed:
+        return sent, failed
+    try:
+        connection.open()
+    except (smtplib.SMTPException, OSError):
+        release(claimed, retry_delay(1, backoff))
+        raise
+    for email in claimed:
+        emails = OutgoingEmail.objects.filter(pk=email.pk)
+        message = EmailMessage(
+            email.subject, email.body, email.from_email or None,
+            [email.to], connection=connection
+        )
+        try:
+            message.send()
+        except Exception as error:
+            # Соединение после ошибки может быть сломано, send откроет новое
+            connection.close()
+            failed += 1
+            if email.attempts >= max_attempts:
+                emails.update(status='failed', last_error=repr(error))
+            else:
+                emails.update(
+                    last_error=repr(error),
+                    next_attempt_at=timezone.now() + retry_delay(
+                        email.attempts, backoff
+                    ),
+                )
+            continue
+        sent += 1
+        emails.update(status='sent', sent_at=timezone.now())
+    return sent, failed
@@ -0,0 +1,130 @@
+from collections import Counter
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .models import Category, Comment, Genre, Ranking, Review, Title
+
+# Данные изменены массово, в обход сигналов отдельных объектов
+bulk_imported = Signal()
+# Объекты objects вставлены через bulk_create, post_save не отправлялся
+bulk_created = Signal(providing_args=['objects'])
+# Агрегаты оценок и таблица лидеров пересчитаны запросами UPDATE
+ratings_rebuilt = Signal()
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    titles = Title.objects.filter(pk=instance.title_id)
+    old_title_id, old_score = getattr(instance, '_rating_state', (None, None))
+    if created:
+        titles.apply_review_delta(1, instance.score)
+    elif old_title_id is None or old_score is None:
+        titles.rebuild_review_stats()
+    elif old_title_id != instance.title_id:
+        Title.objects.filter(pk=old_title_id).apply_review_delta(
+            -1, -old_score
+        )
+        titles.apply_review_delta(1, instance.score)
+    else:
+        titles.apply_review_delta(0, instance.score - old_score)
+    instance.remember_rating_state()
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    title_id, score = getattr(instance, '_rating_state', (None, None))
+    if title_id is None or score is None:
+        title_id, score = instance.title_id, instance.score
+    Title.objects.filter(pk=title_id).apply_review_delta(-1, -score)
+
+
+@receiver(bulk_created, sender=Review)
+def update_rating_on_bulk_create(sender, objects, **kwargs):
+    counts, scores = Counter(), Counter()
+    for review in objects:
+        counts[review.title_id] += 1
+        scores[review.title_id] += review.score
+        review.remember_rating_state()
+    for title_id, count in counts.items():
+        Title.objects.filter(pk=title_id).apply_review_delta(
+            count, scores[title_id], rank=False
+        )
+    Title.objects.filter(pk__in=counts).sync_rankings()
+
+
+@receiver(post_save, sender=Title)
+def bump_title_version(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Title.objects.filter(pk=instance.pk).bump_version()
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_version_on_title_genres(sender, instance, action, reverse, pk_set,
+                                 **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            Title.objects.filter(pk=instance.pk).bump_version()
+    elif action in ('post_add', 'post_remove'):
+        Title.objects.filter(pk__in=pk_set).bump_version()
+    elif action == 'pre_clear':
+        Title.objects.filter(genre=instance).bump_version()
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_version_on_comment(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Title.objects.filter(reviews=instance.review_id).bump_version()
+
+
+@receiver(bulk_created, sender=Comment)
+def bump_version_on_bulk_comments(sender, objects, **kwargs):
+    Title.objects.filter(
+        reviews__in={comment.review_id for comment in objects}
+    ).bump_version()
+
+
+@receiver(post_save, sender=Category)
+def bump_version_on_category(sender, instance, created, raw=False,
+                             **kwargs):
+    if not created and not raw:
+        Title.objects.filter(category=instance).bump_version()
+
+
+@receiver(post_save, sender=Genre)
+def bump_version_on_genre(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        Title.objects.filter(genre=instance).bump_version()
+
+
+@receiver(post_save, sender=Title)
+def rank_title(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Ranking.objects.rebuild([instance.pk])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def rank_title_genres(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            Ranking.objects.rebuild([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        Ranking.objects.rebuild(pk_set)
+    elif action == 'pre_clear':
+        Ranking.objects.filter(scope=f'genre:{instance.pk}').delete()
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def drop_ranking_scope(sender, instance, **kwargs):
+    Ranking.objects.filter(
+        scope=f'{sender._meta.model_name}:{instance.pk}'
+    ).delete()
+
+
+@receiver(bulk_imported)
+def rebuild_rankings(sender, **kwargs):
+    Ranking.objects.rebuild()
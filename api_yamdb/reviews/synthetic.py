@@ -0,0 +1,101 @@
+import random
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .bulk import batched, keep_pub_date, next_pk
+from .models import Category, Comment, Genre, Review, Title, User
+
+WORDS = (
+    'побег', 'крестный', 'отец', 'война', 'мир', 'звёзды', 'город', 'ночь',
+    'песня', 'море', 'лес', 'дорога', 'время', 'свет', 'тень', 'сердце',
+    'король', 'дом', 'зима', 'лето', 'путь', 'тайна', 'остров', 'огонь',
+)
+CATEGORIES = (('Фильм', 'movie'), ('Книга', 'book'), ('Музыка', 'music'))
+GENRES = (
+    ('Драма', 'drama'), ('Комедия', 'comedy'), ('Вестерн', 'western'),
+    ('Фэнтези', 'fantasy'), ('Фантастика', 'sci-fi'),
+    ('Детектив', 'detective'),
+    ('Триллер', 'thriller'), ('Сказка', 'tale'), ('Гонзо', 'gonzo'),
+    ('Роман', 'roman'), ('Баллада', 'ballad'), ('Рок-н-ролл', 'rock-n-roll'),
+    ('Классика', 'classical'), ('Рок', 'rock'), ('Шансон', 'chanson'),
+)
+
+
+def seed(titles=1000, reviews=10000, comments=0, batch_size=5000,
+         random_seed=0):
+    """Наполняет базу синтетическими данными в форме static/data.
+
+    Отзывы распределяются по произведениям равномерно, поэтому авторов
+    создаётся столько, сколько отзывов приходится на одно произведение.
+    Объекты вставляются пачками с заранее назначенными id, так что память
+    не растёт вместе с объёмом данных. Возвращает диапазоны созданных id.
+    """
+    rng = random.Random(random_seed)
+    reviews_per_title = max(1, -(-reviews // max(titles, 1)))
+    start = timezone.now() - timedelta(days=3650)
+
+    first_user = next_pk(User)
+    User.objects.bulk_create(
+        (User(pk=first_user + i, username=f'synthetic{first_user + i}',
+              email=f'synthetic{first_user + i}@yamdb.fake')
+         for i in range(reviews_per_title)),
+        batch_size=batch_size,
+    )
+    categories = [
+        Category.objects.get_or_create(slug=slug, defaults={'name': name})[0]
+        for name, slug in CATEGORIES
+    ]
+    genres = [
+        Genre.objects.get_or_create(slug=slug, defaults={'name': name})[0]
+        for name, slug in GENRES
+    ]
+
+    first_title = next_pk(Title)
+    title_ids = range(first_title, first_title + titles)
+    for batch in batched(title_ids, batch_size):
+        Title.objects.bulk_create(
+            Title(pk=pk, name=' '.join(rng.sample(WORDS, 3)),
+                  year=rng.randint(1900, 2020), description='',
+                  category=rng.choice(categories))
+            for pk in batch
+        )
+        Title.genre.through.objects.bulk_create(
+            Title.genre.through(title_id=pk, genre_id=genre.pk)
+            for pk in batch
+            for genre in rng.sample(genres, rng.randint(1, 3))
+        )
+
+    first_review = next_pk(Review)
+    first_comment = next_pk(Comment)
+    with keep_pub_date():
+        review_rows = (
+            Review(pk=first_review + i,
+                   title_id=first_title + i // reviews_per_title,
+                   author_id=first_user + i % reviews_per_title,
+                   text=' '.join(rng.choices(WORDS, k=20)),
+                   score=rng.randint(1, 10),
+                   pub_date=start + timedelta(minutes=i))
+            for i in range(min(reviews, titles * reviews_per_title))
+        )
+        for batch in batched(review_rows, batch_size):
+            Review.objects.bulk_create(batch)
+        review_count = next_pk(Review) - first_review
+        comment_rows = (
+            Comment(pk=first_comment + i,
+                    review_id=first_review + rng.randrange(review_count),
+                    author_id=first_user + rng.randrange(reviews_per_title),
+                    text=' '.join(rng.choices(WORDS, k=8)),
+                    pub_date=start + timedelta(minutes=i))
+            for i in range(comments if review_count else 0)
+        )
+        for batch in batched(comment_rows, batch_size):
+            Comment.objects.bulk_create(batch)
+    Title.objects.filter(
+        pk__gte=first_title, pk__lt=first_title + titles
+    ).rebuild_review_stats()
+    return {
+        'titles': title_ids,
+        'reviews': range(first_review, next_pk(Review)),
+        'comments': range(first_comment, next_pk(Comment)),
+    }
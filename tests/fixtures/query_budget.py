@@ -0,0 +1,40 @@
+import pytest
+
+from api.querycheck import query_problems
+
+# Медленные запросы зависят от машины и только выводятся в лог
+FAILING = ('budget', 'repeated')
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers',
+        'allow_query_problems: не проваливать тест из-за N+1 '
+        'и превышения query_budget'
+    )
+
+
+@pytest.fixture(autouse=True)
+def found_query_problems(request):
+    """Находки QueryInspectorMiddleware за время теста.
+
+    Превышение query_budget представления или N+1 проваливает тест,
+    если он не помечен allow_query_problems.
+    """
+    found = []
+
+    def collect(sender, request, problems, **kwargs):
+        found.extend(
+            (kind, f'{request.method} {request.path}: {message}')
+            for kind, message in problems
+        )
+
+    query_problems.connect(collect, weak=False)
+    yield found
+    query_problems.disconnect(collect)
+    failures = [message for kind, message in found if kind in FAILING]
+    if failures and not request.node.get_closest_marker(
+        'allow_query_problems'
+    ):
+        pytest.fail('Лишние запросы к базе:\n' + '\n'.join(failures),
+                    pytrace=False)
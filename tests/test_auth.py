@@ -0,0 +1,158 @@
+import re
+
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from reviews.models import OutgoingEmail, User
+
+
+def last_code():
+    body = OutgoingEmail.objects.latest('id').body
+    return re.search(r'код подтверждения: (\S+)', body).group(1)
+
+
+@pytest.mark.django_db
+class TestAuth:
+    signup = '/api/v1/auth/signup/'
+    token = '/api/v1/auth/token/'
+
+    def test_code_exchange(self, client, user, django_assert_num_queries):
+        data = {'username': user.username, 'email': user.email}
+        response = client.post(self.signup, data)
+        assert response.status_code == 200, (
+            'Проверьте, что код можно запросить повторно'
+        )
+        code = last_code()
+        with django_assert_num_queries(2):
+            response = client.post(self.token, {
+                'username': user.username, 'confirmation_code': code
+            })
+        assert response.status_code == 200
+        assert 'access' in response.json()
+
+        response = client.post(self.token, {
+            'username': user.username, 'confirmation_code': code
+        })
+        assert response.status_code == 400, (
+            'Проверьте, что код подтверждения действует один раз'
+        )
+
+        client.post(self.signup, data)
+        assert client.post(self.token, {
+            'username': user.username, 'confirmation_code': last_code()
+        }).status_code == 200, (
+            'Проверьте, что после выдачи токена работает новый код'
+        )
+
+        response = client.post(self.token, {
+            'username': user.username, 'confirmation_code': code[:-1] + 'x'
+        })
+        assert response.status_code == 400
+
+    def test_code_expires(self, client, user, settings):
+        client.post(self.signup,
+                    {'username': user.username, 'email': user.email})
+        settings.CONFIRMATION_CODE_TIMEOUT = -1
+        response = client.post(self.token, {
+            'username': user.username, 'confirmation_code': last_code()
+        })
+        assert response.status_code == 400, (
+            'Проверьте, что код действует ограниченное время'
+        )
+
+    def test_username_throttle(self, client, user, settings,
+                               django_assert_num_queries):
+        data = {'username': user.username, 'confirmation_code': 'x'}
+        for _ in range(5):
+            assert client.post(self.token, data).status_code == 400
+        with django_assert_num_queries(0):
+            response = client.post(self.token, data)
+        assert response.status_code == 429, (
+            'Проверьте ограничение частоты запросов по username'
+        )
+        assert client.post(self.token, {
+            'username': 'other', 'confirmation_code': 'x'
+        }).status_code == 404
+
+
+# Первый запрос с токеном читает отметку отзыва из базы сверх бюджета
+@pytest.mark.django_db
+@pytest.mark.allow_query_problems
+class TestClaimsAuthentication:
+
+    @pytest.fixture
+    def client(self):
+        return APIClient()
+
+    def get_token(self, client, user):
+        client.post('/api/v1/auth/signup/',
+                    {'username': user.username, 'email': user.email})
+        return client.post('/api/v1/auth/token/', {
+            'username': user.username, 'confirmation_code': last_code()
+        }).json()['access']
+
+    def test_no_user_query(self, client, admin, title,
+                           django_assert_num_queries):
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {self.get_token(client, admin)}'
+        )
+        # Отметка отзыва читается из базы один раз и кэшируется
+        client.get('/api/v1/genres/')
+        # COUNT(*), страница, жанры — без чтения пользователя
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        response = client.patch(f'/api/v1/titles/{title.id}/',
+                                {'name': 'Другое'})
+        assert response.status_code == 200, (
+            'Проверьте, что роль берётся из claims токена'
+        )
+
+    def test_role_change_revokes_token(self, client, admin, title):
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {self.get_token(client, admin)}'
+        )
+        admin.role = 'user'
+        admin.save()
+        response = client.patch(f'/api/v1/titles/{title.id}/',
+                                {'name': 'Другое'})
+        assert response.status_code == 401, (
+            'Проверьте, что смена роли отзывает выданные токены'
+        )
+        client.credentials()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {self.get_token(client, admin)}'
+        )
+        response = client.patch(f'/api/v1/titles/{title.id}/',
+                                {'name': 'Другое'})
+        assert response.status_code == 403
+
+    def test_revocation_survives_cache_loss(self, client, admin, title):
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {self.get_token(client, admin)}'
+        )
+        assert client.get('/api/v1/users/me/').status_code == 200
+        admin.role = 'user'
+        admin.save()
+        cache.clear()
+        response = client.patch(f'/api/v1/titles/{title.id}/',
+                                {'name': 'Другое'})
+        assert response.status_code == 401, (
+            'Проверьте, что отзыв токенов хранится в базе, а не только '
+            'в кэше'
+        )
+
+    def test_inactive_and_deleted_user(self, client, user):
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {self.get_token(client, user)}'
+        )
+        assert client.get('/api/v1/users/me/').status_code == 200
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        cache.clear()
+        assert client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что токен заблокированного пользователя не работает'
+        )
+        User.objects.filter(pk=user.pk).delete()
+        cache.clear()
+        assert client.get('/api/v1/users/me/').status_code == 401
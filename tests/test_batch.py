@@ -0,0 +1,107 @@
+import pytest
+
+from api.batch.views import ReviewBatchView
+from reviews.models import Category, Comment, Review, Title
+
+
+@pytest.fixture
+def titles(title):
+    category = Category.objects.get(slug='movie')
+    return [title] + [
+        Title.objects.create(name=f'Произведение {i}', year=2000,
+                             description='', category=category)
+        for i in range(3)
+    ]
+
+
+@pytest.mark.django_db
+class TestBatch:
+
+    def test_reviews_batch(self, client, user_client, user, titles,
+                           django_assert_max_num_queries):
+        Review.objects.create(title=titles[0], author=user, text='Уже',
+                              score=5)
+        client.get('/api/v1/titles/')
+        items = [
+            {'title_id': titles[0].id, 'text': 'Повтор', 'score': 5},
+            {'title_id': titles[1].id, 'text': 'Отлично', 'score': 9},
+            {'title_id': titles[2].id, 'text': 'Хорошо', 'score': 6},
+            {'title_id': titles[2].id, 'text': 'Ещё раз', 'score': 6},
+            {'title_id': 0, 'text': 'Нет такого', 'score': 6},
+            {'title_id': titles[3].id, 'text': 'Оценка', 'score': 11},
+        ]
+        # Плюс один UPDATE таблицы лидеров на весь пакет и точка
+        # сохранения с проверкой внешних ключей вокруг вставки
+        with django_assert_max_num_queries(12):
+            response = user_client.post('/api/v1/reviews/batch/', items,
+                                        format='json')
+        assert response.status_code == 207
+        statuses = [item['status'] for item in response.json()]
+        assert statuses == [400, 201, 201, 400, 404, 400], (
+            'Проверьте статусы элементов пакета'
+        )
+        created = response.json()[1]['data']
+        assert Review.objects.get(pk=created['id']).text == 'Отлично'
+        assert created['author'] == user.username
+        titles[1].refresh_from_db()
+        assert (titles[1].review_count, titles[1].rating) == (1, 9), (
+            'Проверьте, что рейтинг пересчитан для произведений пакета'
+        )
+        titles = client.get('/api/v1/titles/').json()['results']
+        assert titles[1]['rating'] == 9, (
+            'Проверьте, что пакетная запись сбрасывает кэш ответов'
+        )
+
+    # После конфликта элементы вставляются по одному
+    @pytest.mark.allow_query_problems
+    def test_concurrent_duplicate(self, user_client, user, titles,
+                                  monkeypatch):
+        check = ReviewBatchView.check
+
+        def racing_check(view, items):
+            errors = check(view, items)
+            # Параллельные запросы успели создать отзыв и удалить
+            # произведение после проверки
+            if not Review.objects.filter(title=titles[1]).exists():
+                Review.objects.create(title=titles[1], author=user,
+                                      text='Параллельно', score=5)
+                Title.objects.filter(pk=titles[3].pk).delete()
+            return errors
+
+        monkeypatch.setattr(ReviewBatchView, 'check', racing_check)
+        response = user_client.post('/api/v1/reviews/batch/', [
+            {'title_id': titles[1].id, 'text': 'Отзыв', 'score': 9},
+            {'title_id': titles[2].id, 'text': 'Отзыв', 'score': 6},
+            {'title_id': titles[3].id, 'text': 'Отзыв', 'score': 7},
+        ], format='json')
+        assert response.status_code == 207, (
+            'Проверьте, что конфликт с параллельной записью не даёт 500'
+        )
+        assert [item['status'] for item in response.json()] == [
+            400, 201, 404
+        ]
+        assert Review.objects.filter(title=titles[2]).exists()
+
+    def test_comments_batch(self, user_client, user, title):
+        review = Review.objects.create(title=title, author=user,
+                                       text='Отзыв', score=5)
+        response = user_client.post(
+            '/api/v1/comments/batch/',
+            [{'review_id': review.id, 'text': f'К{i}'} for i in range(3)],
+            format='json'
+        )
+        assert response.status_code == 201
+        assert Comment.objects.filter(review=review).count() == 3
+        version = title.version
+        title.refresh_from_db()
+        assert title.version > version
+
+    def test_batch_limits(self, client, user_client, settings):
+        settings.API_BATCH_SIZE = 2
+        url = '/api/v1/comments/batch/'
+        assert client.post(url, [],
+                           content_type='application/json').status_code == 401
+        assert user_client.post(url, {}, format='json').status_code == 400
+        assert user_client.post(
+            url, [{'review_id': 1, 'text': 'К'}] * 3, format='json'
+        ).status_code == 400, 'Проверьте ограничение размера пакета'
@@ -0,0 +1,48 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Comment, Review, Title
+
+
+@pytest.mark.django_db
+class TestBenchmarkCommands:
+
+    def test_benchmark_indexes(self):
+        out = StringIO()
+        call_command('benchmark_indexes', titles=50, reviews=500,
+                     comments=100, repeat=2, stdout=out)
+        assert 'без индексов -> с индексами' in out.getvalue()
+        assert not Title.objects.exists() and not Review.objects.exists(), (
+            'Проверьте, что бенчмарк откатывает созданные данные'
+        )
+
+    def test_benchmark_serializers(self):
+        out = StringIO()
+        call_command('benchmark_serializers', titles=20, reviews=100,
+                     comments=20, page_size=10, repeat=2, stdout=out)
+        assert 'DRF -> из .values()' in out.getvalue()
+        assert not Title.objects.exists(), (
+            'Проверьте, что бенчмарк откатывает созданные данные'
+        )
+
+    def test_seed_data(self):
+        call_command('seed_data', '--titles', '10', '--reviews', '50',
+                     '--comments', '20', stdout=StringIO())
+        assert Title.objects.count() == 10
+        assert Review.objects.count() == 50
+        assert Comment.objects.count() == 20
+        title = Title.objects.first()
+        assert title.review_count == 5, (
+            'Проверьте, что seed_data пересчитывает агрегаты отзывов'
+        )
+
+
+@pytest.mark.django_db
+class TestBenchmarkConnections:
+
+    def test_benchmark_connections(self):
+        out = StringIO()
+        call_command('benchmark_connections', '--repeat', '5', stdout=out)
+        assert 'Установка соединения' in out.getvalue()
@@ -0,0 +1,63 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    def test_anonymous_list_cached(self, client, title,
+                                   django_assert_num_queries):
+        first = client.get('/api/v1/titles/')
+        with django_assert_num_queries(0):
+            second = client.get('/api/v1/titles/')
+        assert second.status_code == 200
+        assert second.json() == first.json(), (
+            'Проверьте, что из кэша отдаётся тот же ответ'
+        )
+
+    def test_query_params_in_key(self, client, title):
+        client.get('/api/v1/titles/')
+        response = client.get('/api/v1/titles/?genre=comedy')
+        assert response.json()['count'] == 0, (
+            'Проверьте, что параметры запроса входят в ключ кэша'
+        )
+
+    def test_review_invalidates_title_and_reviews(self, client, title,
+                                                  user_client):
+        client.get('/api/v1/titles/')
+        client.get(f'/api/v1/titles/{title.id}/reviews/')
+        review = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Отзыв', 'score': 9}
+        ).json()
+
+        titles = client.get('/api/v1/titles/').json()
+        assert titles['results'][0]['rating'] == 9, (
+            'Проверьте, что новый отзыв сбрасывает кэш списка произведений'
+        )
+        reviews = client.get(f'/api/v1/titles/{title.id}/reviews/').json()
+        assert [item['id'] for item in reviews['results']] == [review['id']]
+
+        comments_url = (
+            f'/api/v1/titles/{title.id}/reviews/{review["id"]}/comments/'
+        )
+        client.get(comments_url)
+        user_client.post(comments_url, data={'text': 'Комментарий'})
+        assert client.get(comments_url).json()['count'] == 1, (
+            'Проверьте, что новый комментарий сбрасывает кэш комментариев'
+        )
+
+    def test_category_invalidated(self, client, admin_client):
+        client.get('/api/v1/categories/')
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Книга', 'slug': 'book'}
+        )
+        assert client.get('/api/v1/categories/').json()['count'] == 1
+
+    def test_authenticated_not_cached(self, user_client, title,
+                                      django_assert_max_num_queries):
+        user_client.get('/api/v1/titles/')
+        with django_assert_max_num_queries(4) as context:
+            user_client.get('/api/v1/titles/')
+        assert len(context.captured_queries) > 0, (
+            'Проверьте, что ответы авторизованным пользователям не кэшируются'
+        )
@@ -0,0 +1,59 @@
+import io
+
+import pytest
+from rest_framework.exceptions import ParseError
+
+from api.renderers import FastJSONParser, FastJSONRenderer
+from reviews.models import Comment, Genre, Review, Title
+
+
+def normalized(results):
+    for item in results:
+        if 'genre' in item:
+            item['genre'] = sorted(item['genre'], key=lambda g: g['slug'])
+    return results
+
+
+@pytest.mark.django_db
+class TestCompiledSerializers:
+
+    @pytest.mark.parametrize('path', [
+        '/api/v1/titles/',
+        '/api/v1/titles/?genre=drama',
+        '/api/v1/titles/{title}/reviews/',
+        '/api/v1/titles/{title}/reviews/{review}/comments/',
+    ])
+    def test_same_output(self, client, settings, title, user, path):
+        title.genre.add(Genre.objects.create(name='Комедия', slug='comedy'))
+        Title.objects.create(name='Без категории', year=2000)
+        review = Review.objects.create(title=title, author=user,
+                                       text='Отзыв ', score=8)
+        Comment.objects.create(review=review, author=user, text='К')
+        path = path.format(title=title.id, review=review.id)
+        compiled = client.get(path)
+        settings.API_COMPILED_SERIALIZERS = False
+        regular = client.get(path + ('&' if '?' in path else '?') + 'v=1')
+        assert compiled.status_code == regular.status_code == 200
+        assert normalized(compiled.json()['results']) == normalized(
+            regular.json()['results']
+        ), 'Проверьте, что списки из .values() совпадают с обычными'
+        assert not {'review_count', 'score_sum', 'version'} & set(
+            compiled.json()['results'][0]
+        ), 'Проверьте, что служебные счётчики не попадают в ответ'
+
+
+class TestFastJSON:
+
+    def test_renderer(self):
+        data = {'text': 'Строка ', 'score': 5, 'list': []}
+        assert FastJSONRenderer().render(data) == (
+            '{"text":"Строка\\u2028","score":5,"list":[]}'.encode()
+        ), 'Проверьте, что вывод совпадает с JSONRenderer'
+        assert FastJSONRenderer().render(None) == b''
+
+    def test_parser(self):
+        assert FastJSONParser().parse(
+            io.BytesIO('{"text": "Отзыв"}'.encode())
+        ) == {'text': 'Отзыв'}
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"text":'))
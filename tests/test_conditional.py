@@ -0,0 +1,98 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def test_reviews_not_modified(self, client, title, user_client,
+                                  django_assert_num_queries):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        user_client.post(url, data={'text': 'Отзыв', 'score': 8})
+        response = user_client.get(url)
+        etag = response['ETag']
+        assert response.has_header('Last-Modified'), (
+            'Проверьте, что список отзывов отдаёт Last-Modified'
+        )
+
+        with django_assert_num_queries(1):
+            response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что неизменившийся список отзывов отдаёт 304 '
+            'без выборки и сериализации'
+        )
+        assert response['ETag'] == etag
+
+    def test_edit_changes_etag(self, title, user_client):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        review = user_client.post(
+            url, data={'text': 'Отзыв', 'score': 8}
+        ).json()
+        etag = user_client.get(url)['ETag']
+        user_client.patch(f'{url}{review["id"]}/', data={'text': 'Правка'})
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что правка текста отзыва меняет ETag списка'
+        )
+        assert response['ETag'] != etag
+
+    def test_author_rename_changes_etag(self, client, title, user_client):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        review = user_client.post(
+            url, data={'text': 'Отзыв', 'score': 8}
+        ).json()
+        comments_url = f'{url}{review["id"]}/comments/'
+        user_client.post(comments_url, data={'text': 'Комментарий'})
+        urls = (url, f'{url}{review["id"]}/', comments_url)
+        etags = [client.get(page)['ETag'] for page in urls]
+        user_client.patch('/api/v1/users/me/', data={'username': 'renamed'})
+        for page, etag in zip(urls, etags):
+            response = client.get(page, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200, (
+                'Проверьте, что смена username автора меняет ETag '
+                'отзывов и комментариев'
+            )
+            assert 'renamed' in response.content.decode()
+
+    def test_comment_changes_title_etag(self, client, title, user_client):
+        etag = client.get(f'/api/v1/titles/{title.id}/')['ETag']
+        review = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Отзыв', 'score': 8}
+        ).json()
+        comments_url = (
+            f'/api/v1/titles/{title.id}/reviews/{review["id"]}/comments/'
+        )
+        user_client.post(comments_url, data={'text': 'Комментарий'})
+        response = client.get(
+            f'/api/v1/titles/{title.id}/', HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 200
+        etag = client.get(comments_url)['ETag']
+        assert client.get(
+            comments_url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == 304
+
+    def test_cached_response_not_modified(self, client, title,
+                                          django_assert_num_queries):
+        etag = client.get('/api/v1/titles/')['ETag']
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что ETag хранится вместе с закэшированным ответом'
+        )
+
+    def test_titles_etag_without_queries(self, title, user_client,
+                                         admin_client,
+                                         django_assert_num_queries):
+        etag = user_client.get('/api/v1/titles/')['ETag']
+        with django_assert_num_queries(0):
+            response = user_client.get('/api/v1/titles/',
+                                       HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что ETag списка произведений берётся из версии кэша'
+        )
+        admin_client.patch(f'/api/v1/titles/{title.id}/',
+                           data={'name': 'Новое название'})
+        assert user_client.get(
+            '/api/v1/titles/', HTTP_IF_NONE_MATCH=etag
+        ).status_code == 200
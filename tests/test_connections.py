@@ -0,0 +1,38 @@
+import pytest
+from django.db import connection
+
+from api.signals import check_persistent_connections
+
+
+@pytest.mark.django_db
+class TestConnectionHealthChecks:
+
+    def test_unusable_connection_is_closed(self, monkeypatch):
+        checks, closed = [], []
+        connection.ensure_connection()
+        monkeypatch.setitem(connection.settings_dict,
+                            'CONN_HEALTH_CHECKS', True)
+        monkeypatch.setattr(connection, 'is_usable',
+                            lambda: checks.append(True))
+        monkeypatch.setattr(connection, 'close',
+                            lambda: closed.append(True))
+        check_persistent_connections(sender=None)
+        assert not checks, (
+            'Проверьте, что соединение не проверяется до первого обращения'
+        )
+        connection.ensure_connection()
+        connection.ensure_connection()
+        assert len(checks) == 1, (
+            'Проверьте, что соединение проверяется один раз за запрос'
+        )
+        assert closed, 'Проверьте, что оборванное соединение закрывается'
+
+    def test_check_can_be_disabled(self, monkeypatch):
+        connection.ensure_connection()
+        monkeypatch.setitem(connection.settings_dict,
+                            'CONN_HEALTH_CHECKS', False)
+        monkeypatch.setattr(connection, 'is_usable', lambda: False)
+        monkeypatch.setattr(connection, 'close',
+                            lambda: pytest.fail('Соединение закрыто'))
+        check_persistent_connections(sender=None)
+        connection.ensure_connection()
@@ -1,5 +1,9 @@
 import os
 import re
+import runpy
+from types import SimpleNamespace
+
+import pytest
 
 from .conftest import infra_dir_path, root_dir
 
@@ -27,3 +31,35 @@ class TestDockerfileCompose:
         assert re.search(r'image:\s+([a-zA-Z0-9]+)\/([a-zA-Z0-9_\.])+(\:[a-zA-Z0-9_-]+)?', docker_compose), (
             'Проверьте, что добавили сборку контейнера из образа на вашем DockerHub в файл docker-compose.yaml'
         )
+
+    def test_nginx_config(self):
+        with open(os.path.join(infra_dir_path, 'nginx', 'default.conf')) as f:
+            config = f.read()
+        assert re.search(r'gzip_types[^;]*application/json', config), (
+            'Проверьте, что nginx сжимает JSON'
+        )
+        assert re.search(r'upstream web \{[^}]*keepalive \d+;', config), (
+            'Проверьте, что соединения с gunicorn переиспользуются'
+        )
+        assert 'proxy_no_cache $http_authorization' in config, (
+            'Проверьте, что микрокэш не хранит ответы с токеном'
+        )
+        assert 'immutable' in config
+
+    def test_shared_cache(self):
+        with open(os.path.join(infra_dir_path, 'docker-compose.yaml')) as f:
+            docker_compose = f.read()
+        assert 'CACHE_BACKEND=django_redis.cache.RedisCache' in docker_compose, (
+            'Проверьте, что web использует общий кэш Redis'
+        )
+        assert 'NUM_PROXIES=1' in docker_compose, (
+            'Проверьте, что троттлинг анонимов видит IP клиента за nginx'
+        )
+        config = runpy.run_path(
+            os.path.join(root_dir, 'api_yamdb', 'gunicorn.conf.py')
+        )
+        server = SimpleNamespace(cfg=SimpleNamespace(workers=3))
+        with pytest.raises(RuntimeError):
+            config['on_starting'](server)
+        server.cfg.workers = 1
+        config['on_starting'](server)
@@ -0,0 +1,72 @@
+import csv
+import json
+import os
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.utils import timezone
+
+from reviews.models import Review
+
+DATA_DIR = os.path.join(settings.BASE_DIR, 'static', 'data')
+
+
+def static_rows(name):
+    with open(os.path.join(DATA_DIR, f'reviews_{name}.csv'),
+              encoding='utf-8') as source:
+        return list(csv.DictReader(source))
+
+
+def content(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    @pytest.fixture(autouse=True)
+    def static_data(self):
+        call_command('import_csv', stdout=StringIO())
+
+    def test_command_round_trip(self):
+        for name in ('title', 'review', 'comment'):
+            out = StringIO()
+            call_command('export_data', name, stdout=out)
+            rows = list(csv.DictReader(StringIO(out.getvalue())))
+            expected = sorted(static_rows(name),
+                              key=lambda row: int(row['id']))
+            assert rows == expected, (
+                f'Проверьте, что выгрузка {name} совпадает со static/data'
+            )
+
+    def test_endpoint_is_admin_only(self, client, user_client):
+        assert client.get('/api/v1/export/review/').status_code == 401
+        assert user_client.get('/api/v1/export/review/').status_code == 403
+
+    def test_endpoint_ndjson_since(self, admin_client):
+        since = '2020-01-01T00:00:00Z'
+        fresh = list(Review.objects.order_by('id').values_list(
+            'id', flat=True)[:3])
+        Review.objects.filter(pk__in=fresh).update(pub_date=timezone.now())
+        response = admin_client.get(
+            '/api/v1/export/review/', {'output': 'ndjson', 'since': since}
+        )
+        assert response.status_code == 200
+        assert response.streaming, 'Проверьте, что ответ отдаётся потоком'
+        rows = [json.loads(line) for line in content(response).splitlines()]
+        assert [row['id'] for row in rows] == fresh, (
+            'Проверьте фильтр since по дате публикации'
+        )
+        assert rows[0]['pub_date'].endswith('Z')
+
+    def test_endpoint_errors(self, admin_client):
+        assert admin_client.get(
+            '/api/v1/export/unknown/').status_code == 404
+        assert admin_client.get(
+            '/api/v1/export/title/', {'since': '2020-01-01'}
+        ).status_code == 400
+        assert admin_client.get(
+            '/api/v1/export/review/', {'output': 'xml'}
+        ).status_code == 400
@@ -0,0 +1,65 @@
+import pytest
+
+from reviews.models import Category, Genre, Review, Title
+
+
+@pytest.fixture
+def catalogue(title, user):
+    book = Category.objects.create(name='Книга', slug='book')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    drama = title.genre.get()
+    for name, year, category, genres in (
+        ('Комедия и драма', 1999, title.category, [comedy, drama]),
+        ('Книжная комедия', 2005, book, [comedy]),
+        ('Без категории', 2011, None, [comedy]),
+    ):
+        extra = Title.objects.create(name=name, year=year, category=category)
+        extra.genre.set(genres)
+    Review.objects.create(title=title, author=user, text='О', score=9)
+    return title
+
+
+def names(response):
+    return sorted(item['name'] for item in response.json()['results'])
+
+
+@pytest.mark.django_db
+class TestTitleFilters:
+
+    def test_multi_value_genres(self, client, catalogue):
+        response = client.get('/api/v1/titles/?genre=drama,comedy')
+        assert response.json()['count'] == 4, (
+            'Проверьте, что жанры через запятую объединяются по ИЛИ '
+            'и произведения не повторяются'
+        )
+        response = client.get(
+            '/api/v1/titles/?genre=drama,comedy&genre_mode=and'
+        )
+        assert names(response) == ['Комедия и драма']
+
+    def test_ranges(self, client, catalogue):
+        response = client.get('/api/v1/titles/?year_min=1999&year_max=2010')
+        assert names(response) == ['Книжная комедия', 'Комедия и драма']
+        response = client.get('/api/v1/titles/?rating_min=5')
+        assert names(response) == ['Побег из Шоушенка']
+        response = client.get('/api/v1/titles/?category=movie,book')
+        assert response.json()['count'] == 3
+
+    def test_facets(self, client, catalogue, django_assert_num_queries):
+        with django_assert_num_queries(4):
+            response = client.get(
+                '/api/v1/titles/?category=movie&facets=genre,category,year'
+            )
+        assert response.json()['count'] == 2
+        assert response.json()['facets'] == {
+            'genre': {'drama': 2, 'comedy': 1},
+            'category': {'movie': 2, 'book': 1},
+            'year': {'1990': 2},
+        }, (
+            'Проверьте счётчики фасетов: фасет категории считается '
+            'без фильтра по категории'
+        )
+        assert 'facets' not in client.get('/api/v1/titles/').json()
+        assert client.get(
+            '/api/v1/titles/?facets=author'
+        ).status_code == 400
@@ -0,0 +1,58 @@
+import csv
+import os
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db.models import Avg
+
+from reviews.models import Comment, Review, Title, User
+
+DATA_DIR = os.path.join(settings.BASE_DIR, 'static', 'data')
+
+
+def csv_rows(name):
+    with open(os.path.join(DATA_DIR, f'reviews_{name}.csv'),
+              encoding='utf-8') as source:
+        return list(csv.DictReader(source))
+
+
+@pytest.mark.django_db
+class TestImportCsv:
+
+    def test_import_static_data(self):
+        out = StringIO()
+        call_command('import_csv', stdout=out)
+        assert 'строк/с' in out.getvalue(), (
+            'Проверьте, что команда сообщает скорость загрузки'
+        )
+        assert User.objects.count() == len(csv_rows('user'))
+        assert Review.objects.count() == len(csv_rows('review'))
+        assert Comment.objects.count() == len(csv_rows('comment'))
+
+        review = csv_rows('review')[0]
+        assert Review.objects.get(
+            pk=review['id']
+        ).pub_date.isoformat().startswith(review['pub_date'][:19]), (
+            'Проверьте, что дата публикации берётся из CSV'
+        )
+        for title in Title.objects.filter(review_count__gt=0):
+            average = title.reviews.aggregate(value=Avg('score'))['value']
+            assert title.rating == int(average), (
+                'Проверьте, что после загрузки рейтинг пересчитан'
+            )
+
+    def test_reimport_and_cache(self, client):
+        call_command('import_csv', stdout=StringIO())
+        before = client.get('/api/v1/titles/').json()['count']
+        Title.objects.filter(pk=1).update(name='Другое название')
+        call_command('import_csv', '--ignore-conflicts', stdout=StringIO())
+        assert Review.objects.count() == len(csv_rows('review')), (
+            'Проверьте, что повторная загрузка пропускает существующие строки'
+        )
+        titles = client.get('/api/v1/titles/').json()
+        assert titles['count'] == before
+        assert titles['results'][0]['name'] == 'Другое название', (
+            'Проверьте, что загрузка сбрасывает кэш ответов'
+        )
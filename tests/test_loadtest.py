@@ -0,0 +1,57 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+
+@pytest.mark.django_db(transaction=True)
+class TestLoadTest:
+
+    def test_loadtest_reports_latency(self, live_server, title):
+        out = StringIO()
+        call_command('loadtest', '--url', live_server.url,
+                     '--path', '/api/v1/titles/',
+                     '--path', f'/api/v1/titles/{title.id}/',
+                     '--requests', '20', '--concurrency', '2',
+                     '--no-cache', '--compressed', stdout=out)
+        report = out.getvalue()
+        assert 'Запросов: 20' in report
+        assert 'p99' in report, 'Проверьте, что команда выводит p99'
+        assert '200: 20' in report
+        assert 'байт' in report, (
+            'Проверьте, что команда выводит размер ответов'
+        )
+
+    def test_api_scenario_results(self, live_server, tmp_path):
+        call_command('seed_data', '--titles', '5', '--reviews', '20',
+                     '--comments', '10', stdout=StringIO())
+        results = tmp_path / 'results.json'
+        call_command('loadtest', '--url', live_server.url,
+                     '--scenario', 'api', '--requests', '28',
+                     '--concurrency', '1', '--output', str(results),
+                     stdout=StringIO())
+        data = json.loads(results.read_text())
+        assert data['total']['requests'] == 28
+        assert set(data['endpoints']) == {
+            'titles', 'titles?genre', 'title', 'reviews', 'comments',
+            'review create', 'comment create',
+        }, 'Проверьте, что сценарий api обходит все виды запросов'
+        # Один поток: SQLite в тестах не допускает параллельной записи
+        assert data['endpoints']['review create']['statuses'] == {
+            '201': 2
+        }, 'Проверьте, что отзывы создаются без конфликтов авторов'
+        assert data['endpoints']['comment create']['statuses'] == {'201': 2}
+
+        out = StringIO()
+        call_command('loadtest', '--url', live_server.url,
+                     '--scenario', 'api', '--requests', '14',
+                     '--concurrency', '1', '--compare', str(results),
+                     stdout=out)
+        assert 'Сравнение с' in out.getvalue()
+        with pytest.raises(CommandError):
+            call_command('loadtest', '--url', live_server.url,
+                         '--scenario', 'api', '--requests', '14',
+                         '--concurrency', '1', '--compare', str(results),
+                         '--max-regression', '-100', stdout=StringIO())
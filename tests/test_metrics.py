@@ -0,0 +1,65 @@
+import pytest
+from django.core.cache import cache
+
+from api.metrics import registry
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    # Накопленное воркером в прошлых тестах не должно попасть в /metrics
+    registry.flush()
+    cache.clear()
+
+
+@pytest.fixture
+def sample_all(settings):
+    settings.METRICS_SAMPLE_RATE = 1
+
+
+@pytest.mark.django_db
+class TestMetrics:
+
+    def test_server_timing(self, client, title, sample_all):
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        timing = response['Server-Timing']
+        for name in ('total;dur=', 'db;dur=', 'serializer;dur='):
+            assert name in timing, (
+                f'Проверьте, что заголовок Server-Timing содержит {name}'
+            )
+        assert 'desc="3 queries"' in timing, (
+            'Проверьте, что Server-Timing считает запросы к базе'
+        )
+
+    def test_unsampled_requests_are_counted(self, client, settings):
+        settings.METRICS_SAMPLE_RATE = 0
+        response = client.get('/api/v1/genres/')
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что запросы вне выборки не замеряются'
+        )
+        body = client.get('/metrics').content.decode()
+        assert ('http_requests_total{view="api:genres-list",'
+                'method="GET",status="200"} 1') in body, (
+            'Проверьте, что счётчик запросов учитывает все запросы'
+        )
+
+    def test_histograms(self, client, title, sample_all):
+        for _ in range(3):
+            client.get('/api/v1/titles/')
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        body = response.content.decode()
+        assert '# TYPE http_request_duration_seconds histogram' in body
+        labels = 'view="api:titles-list",method="GET",status="200"'
+        assert (f'http_request_duration_seconds_count{{{labels}}} 3'
+                in body), 'Проверьте гистограмму времени запросов'
+        # Первый ответ собран за 3 запроса, два следующих взяты из кэша
+        assert ('db_queries_per_request_bucket'
+                '{view="api:titles-list",le="2"} 2') in body
+        assert ('db_queries_per_request_bucket'
+                '{view="api:titles-list",le="3"} 3') in body, (
+            'Проверьте, что корзины гистограммы накопительные'
+        )
+        assert 'serializer_duration_seconds_count{view="api:titles-list"} 3'\
+            in body, 'Проверьте замер времени сериализаторов'
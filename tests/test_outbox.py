@@ -0,0 +1,146 @@
+import json
+import time
+from io import StringIO
+from smtplib import SMTPServerDisconnected
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from reviews.models import OutgoingEmail
+from reviews.outbox import claim_batch
+
+
+class FailingBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        raise SMTPServerDisconnected('нет соединения')
+
+
+class UnreachableBackend(EmailBackend):
+    """Первое соединение с SMTP-сервером не открывается"""
+    refused = True
+
+    def open(self):
+        if UnreachableBackend.refused:
+            UnreachableBackend.refused = False
+            raise ConnectionRefusedError('сервер не отвечает')
+        return super().open()
+
+
+class FlakyBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        if messages[0].to == ['broken@yamdb.fake']:
+            raise ValueError('сломанное письмо')
+        return super().send_messages(messages)
+
+
+@pytest.mark.django_db
+class TestOutbox:
+
+    def test_signup_enqueues_code(self, client):
+        response = client.post('/api/v1/auth/signup/', {
+            'email': 'new@yamdb.fake', 'username': 'newuser'
+        })
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что регистрация не отправляет письмо синхронно'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.to == 'new@yamdb.fake'
+
+        call_command('send_emails', '--once', stdout=StringIO())
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['new@yamdb.fake']
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == ('sent', 1)
+
+    def test_retry_with_backoff(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_outbox.FailingBackend'
+        email = OutgoingEmail.objects.enqueue('Тема', 'Текст',
+                                              'to@yamdb.fake')
+        call_command('send_emails', '--once', '--backoff', '60',
+                     stdout=StringIO())
+        email.refresh_from_db()
+        assert email.status == 'pending'
+        assert email.attempts == 1
+        assert email.next_attempt_at > email.created, (
+            'Проверьте, что повторная попытка отложена'
+        )
+        assert 'нет соединения' in email.last_error
+
+        out = StringIO()
+        call_command('send_emails', '--stats', stdout=out)
+        stats = json.loads(out.getvalue())
+        assert (stats['pending'], stats['due']) == (1, 0)
+
+        OutgoingEmail.objects.update(next_attempt_at=email.created)
+        call_command('send_emails', '--once', '--max-attempts', '2',
+                     stdout=StringIO())
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == ('failed', 2), (
+            'Проверьте, что после последней попытки письмо помечается ошибкой'
+        )
+
+    def test_error_keeps_sent_messages(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_outbox.FlakyBackend'
+        for to in ('first@yamdb.fake', 'broken@yamdb.fake',
+                   'last@yamdb.fake'):
+            OutgoingEmail.objects.enqueue('Тема', 'Текст', to)
+        call_command('send_emails', '--once', stdout=StringIO())
+        assert [message.to[0] for message in mail.outbox] == [
+            'first@yamdb.fake', 'last@yamdb.fake'
+        ], 'Проверьте, что ошибка одного письма не мешает остальным'
+        assert OutgoingEmail.objects.filter(status='sent').count() == 2
+        broken = OutgoingEmail.objects.get(to='broken@yamdb.fake')
+        assert (broken.status, broken.attempts) == ('pending', 1)
+        assert 'сломанное письмо' in broken.last_error
+
+    def test_claimed_emails_are_leased(self):
+        OutgoingEmail.objects.enqueue('Тема', 'Текст', 'to@yamdb.fake')
+        assert len(claim_batch(10, lease=60)) == 1
+        assert claim_batch(10, lease=60) == [], (
+            'Проверьте, что взятое письмо не достаётся другому воркеру'
+        )
+
+    def test_relay_down_once(self, settings, monkeypatch):
+        settings.EMAIL_BACKEND = 'tests.test_outbox.UnreachableBackend'
+        monkeypatch.setattr(UnreachableBackend, 'refused', True)
+        email = OutgoingEmail.objects.enqueue('Тема', 'Текст',
+                                              'to@yamdb.fake')
+        with pytest.raises(CommandError):
+            call_command('send_emails', '--once', stdout=StringIO())
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == ('pending', 0), (
+            'Проверьте, что письмо возвращается в очередь без попытки'
+        )
+        assert email.next_attempt_at > email.created
+
+    def test_worker_survives_relay_outage(self, settings, monkeypatch):
+        settings.EMAIL_BACKEND = 'tests.test_outbox.UnreachableBackend'
+        monkeypatch.setattr(UnreachableBackend, 'refused', True)
+        OutgoingEmail.objects.enqueue('Тема', 'Текст', 'to@yamdb.fake')
+        pauses = []
+
+        def sleep(seconds):
+            pauses.append(seconds)
+            if len(pauses) == 1:
+                # Пауза после сбоя прошла, письмо снова готово к отправке
+                OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+            else:
+                raise KeyboardInterrupt
+
+        monkeypatch.setattr(time, 'sleep', sleep)
+        err = StringIO()
+        call_command('send_emails', '--backoff', '60', '--interval', '5',
+                     stdout=StringIO(), stderr=err)
+        assert 'сервер не отвечает' in err.getvalue()
+        assert pauses == [60, 5], (
+            'Проверьте, что после сбоя воркер ждёт и продолжает работу'
+        )
+        assert len(mail.outbox) == 1
+        email = OutgoingEmail.objects.get()
+        assert (email.status, email.attempts) == ('sent', 1)
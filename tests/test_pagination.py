@@ -0,0 +1,55 @@
+import pytest
+
+from reviews.models import Review
+
+
+@pytest.fixture
+def reviewed_title(title, django_user_model):
+    for i in range(25):
+        author = django_user_model.objects.create_user(
+            username=f'reader{i}', email=f'reader{i}@yamdb.fake'
+        )
+        Review.objects.create(
+            title=title, author=author, text=f'Отзыв {i}', score=5
+        )
+    return title
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def test_page_number_by_default(self, client, reviewed_title):
+        response = client.get(f'/api/v1/titles/{reviewed_title.id}/reviews/')
+        data = response.json()
+        assert data['count'] == 25, (
+            'Проверьте, что по умолчанию пагинация остаётся постраничной'
+        )
+        assert 'page=2' in data['next']
+
+    def test_cursor_crawl(self, client, reviewed_title):
+        url = f'/api/v1/titles/{reviewed_title.id}/reviews/?pagination=cursor'
+        seen = []
+        while url:
+            data = client.get(url).json()
+            assert 'count' not in data, (
+                'Проверьте, что курсорная пагинация не считает COUNT(*)'
+            )
+            seen.extend(item['id'] for item in data['results'])
+            url = data['next']
+        expected = list(
+            reviewed_title.reviews.order_by('pub_date', 'id')
+            .values_list('id', flat=True)
+        )
+        assert seen == expected, (
+            'Проверьте, что курсор обходит отзывы по (pub_date, id) '
+            'без пропусков и повторов'
+        )
+
+    def test_titles_cursor(self, client, reviewed_title):
+        response = client.get('/api/v1/titles/?pagination=cursor')
+        data = response.json()
+        assert response.status_code == 200
+        assert [item['id'] for item in data['results']] == [
+            reviewed_title.id
+        ]
+        assert data['next'] is None
@@ -0,0 +1,68 @@
+import pytest
+
+from reviews.models import Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def catalogue(title, user, another_user):
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(3)
+    ]
+    for i in range(15):
+        extra = Title.objects.create(
+            name=f'Произведение {i}', year=2000, description='',
+            category=title.category
+        )
+        extra.genre.set(genres)
+    for author in (user, another_user):
+        review = Review.objects.create(
+            title=title, author=author, text='Отзыв', score=7
+        )
+        for _ in range(3):
+            Comment.objects.create(review=review, author=author, text='К')
+    return title
+
+
+@pytest.mark.django_db
+class TestQueryCount:
+
+    def test_titles_list(self, client, catalogue,
+                         django_assert_num_queries):
+        # COUNT(*) для пагинации, страница, жанры
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert len(response.json()['results']) == 10, (
+            'Проверьте, что список произведений отдаётся постранично'
+        )
+
+    def test_titles_filtered_list(self, client, catalogue,
+                                  django_assert_num_queries):
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/?genre=genre-1')
+        assert response.status_code == 200
+
+    def test_title_detail(self, client, catalogue,
+                          django_assert_num_queries):
+        with django_assert_num_queries(2):
+            response = client.get(f'/api/v1/titles/{catalogue.id}/')
+        assert response.status_code == 200
+        assert response.json()['rating'] == 7, (
+            'Проверьте, что рейтинг произведения берётся из агрегатов отзывов'
+        )
+
+    def test_reviews_list(self, client, catalogue,
+                          django_assert_num_queries):
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/{catalogue.id}/reviews/')
+        assert response.status_code == 200
+
+    def test_comments_list(self, client, catalogue,
+                           django_assert_num_queries):
+        review = catalogue.reviews.first()
+        with django_assert_num_queries(3):
+            response = client.get(
+                f'/api/v1/titles/{catalogue.id}/reviews/{review.id}/comments/'
+            )
+        assert response.status_code == 200
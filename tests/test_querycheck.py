@@ -0,0 +1,53 @@
+import pytest
+
+from api.querycheck import fingerprint
+from api.views import TitleViewSet
+from reviews.models import Genre, Title
+
+
+@pytest.fixture
+def titles(title):
+    genre = Genre.objects.create(name='Жанр', slug='genre')
+    for i in range(5):
+        extra = Title.objects.create(
+            name=f'Произведение {i}', year=2000, category=title.category
+        )
+        extra.genre.add(genre)
+
+
+class TestFingerprint:
+
+    def test_values_are_dropped(self):
+        assert fingerprint(
+            "SELECT * FROM t WHERE id = %s AND name = 'a''b' LIMIT 21"
+        ) == fingerprint(
+            'SELECT *  FROM t\n WHERE id = %s AND name = %s LIMIT 1'
+        ), 'Проверьте, что значения не влияют на форму запроса'
+        assert fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s)') == (
+            fingerprint('SELECT * FROM t WHERE id IN (%s)')
+        ), 'Проверьте, что длина списка IN не влияет на форму запроса'
+
+
+@pytest.mark.django_db
+@pytest.mark.allow_query_problems
+class TestQueryInspector:
+
+    def test_n_plus_one(self, client, titles, monkeypatch, settings,
+                        found_query_problems):
+        # Жанры по одному запрашивает обычный сериализатор
+        settings.API_COMPILED_SERIALIZERS = False
+        monkeypatch.setattr(TitleViewSet, 'queryset', Title.objects.all())
+        assert client.get('/api/v1/titles/').status_code == 200
+        kinds = [kind for kind, _ in found_query_problems]
+        assert 'repeated' in kinds, (
+            'Проверьте, что повторяющиеся запросы жанров помечаются как N+1'
+        )
+        assert 'budget' in kinds, (
+            'Проверьте, что превышение query_budget обнаруживается'
+        )
+
+    def test_within_budget(self, client, titles, found_query_problems):
+        assert client.get('/api/v1/titles/').status_code == 200
+        assert found_query_problems == [], (
+            'Проверьте, что список произведений укладывается в бюджет'
+        )
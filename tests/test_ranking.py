@@ -0,0 +1,76 @@
+import pytest
+
+from reviews.models import Genre, Ranking, Review, Title
+
+
+@pytest.fixture
+def rated(title, user, another_user):
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    titles = [title]
+    for name in ('Второе', 'Третье', 'Без оценок'):
+        extra = Title.objects.create(name=name, year=2000,
+                                     category=title.category)
+        extra.genre.add(comedy)
+        titles.append(extra)
+    for extra, score in zip(titles, (6, 9, 4)):
+        Review.objects.create(title=extra, author=user, text='О',
+                              score=score)
+    return titles
+
+
+def names(response):
+    return [item['name'] for item in response.json()]
+
+
+@pytest.mark.django_db
+class TestRanking:
+
+    def test_ordering(self, client, rated):
+        response = client.get('/api/v1/titles/?ordering=-rating')
+        assert [item['name'] for item in response.json()['results']] == [
+            'Второе', 'Побег из Шоушенка', 'Третье', 'Без оценок'
+        ], 'Проверьте сортировку по рейтингу: без оценок — в конце'
+        response = client.get('/api/v1/titles/?ordering=name')
+        assert response.json()['results'][0]['name'] == 'Без оценок'
+
+    def test_top_by_scope(self, client, rated):
+        response = client.get('/api/v1/titles/top/?limit=2')
+        assert response.status_code == 200
+        assert names(response) == ['Второе', 'Побег из Шоушенка']
+        response = client.get('/api/v1/titles/top/?genre=comedy')
+        assert names(response) == ['Второе', 'Третье'], (
+            'Проверьте, что в разделе жанра нет произведений без оценок '
+            'и других жанров'
+        )
+        response = client.get('/api/v1/titles/top/?category=movie&limit=1')
+        assert names(response) == ['Второе']
+        assert client.get(
+            '/api/v1/titles/top/?genre=comedy&category=movie'
+        ).status_code == 400
+        assert client.get('/api/v1/titles/top/?limit=0').status_code == 400
+        assert client.get('/api/v1/titles/top/?genre=none').status_code == 404
+
+    def test_top_follows_scores_and_genres(self, client, rated):
+        drama, comedy = rated[0].genre.get(), Genre.objects.get(
+            slug='comedy'
+        )
+        review = Review.objects.get(title=rated[2])
+        review.score = 10
+        review.save()
+        response = client.get('/api/v1/titles/top/?genre=comedy')
+        assert names(response) == ['Третье', 'Второе'], (
+            'Проверьте, что таблица лидеров следует за оценками'
+        )
+        rated[1].genre.set([drama])
+        response = client.get('/api/v1/titles/top/?genre=drama')
+        assert names(response) == ['Второе', 'Побег из Шоушенка'], (
+            'Проверьте, что таблица лидеров следует за жанрами'
+        )
+        comedy.delete()
+        assert not Ranking.objects.filter(
+            scope=f'genre:{comedy.pk}'
+        ).exists()
+        Ranking.objects.all().delete()
+        Ranking.objects.rebuild(batch_size=2)
+        assert Ranking.objects.filter(scope='all').count() == 4
+        assert Ranking.objects.top('all', 1)[0].title_id == rated[2].pk
@@ -0,0 +1,101 @@
+import pytest
+from django.core.management import CommandError, call_command
+
+from reviews.models import Ranking, Review, Title
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def reviews_url(self, title):
+        return f'/api/v1/titles/{title.id}/reviews/'
+
+    def test_rating_follows_reviews(self, title, user_client,
+                                    another_user_client):
+        response = user_client.post(
+            self.reviews_url(title), data={'text': 'Отзыв', 'score': 10}
+        )
+        assert response.status_code == 201, (
+            'Проверьте, что авторизованный пользователь может оставить отзыв'
+        )
+        review_id = response.json()['id']
+        another_user_client.post(
+            self.reviews_url(title), data={'text': 'Отзыв', 'score': 5}
+        )
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum, title.rating) == (
+            2, 15, 7
+        ), 'Проверьте, что рейтинг пересчитывается при создании отзыва'
+
+        user_client.patch(
+            f'{self.reviews_url(title)}{review_id}/', data={'score': 1}
+        )
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum, title.rating) == (
+            2, 6, 3
+        ), 'Проверьте, что рейтинг пересчитывается при изменении оценки'
+
+        user_client.delete(f'{self.reviews_url(title)}{review_id}/')
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum, title.rating) == (
+            1, 5, 5
+        ), 'Проверьте, что рейтинг пересчитывается при удалении отзыва'
+
+    def test_stale_save_keeps_stats(self, title, user, admin_client):
+        Review.objects.create(title=title, author=user, text='Отзыв', score=8)
+        title.name = 'Новое название'
+        title.save()
+        admin_client.patch(f'/api/v1/titles/{title.id}/',
+                           data={'description': 'Описание'})
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum, title.rating) == (
+            1, 8, 8
+        ), 'Проверьте, что save() не затирает агрегаты оценок'
+        assert title.name == 'Новое название'
+        assert Ranking.objects.filter(title=title, rating=8).exists()
+
+    def test_last_review_deleted(self, title, user):
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=8
+        )
+        Review.objects.get(pk=review.pk).delete()
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum, title.rating) == (
+            0, 0, None
+        ), 'Проверьте, что без отзывов рейтинг произведения не задан'
+
+    def test_recalculate_ratings(self, title, user, another_user):
+        Review.objects.create(title=title, author=user, text='1', score=9)
+        Review.objects.create(
+            title=title, author=another_user, text='2', score=4
+        )
+        Title.objects.update(review_count=0, score_sum=0, rating=None)
+
+        with pytest.raises(CommandError):
+            call_command('recalculate_ratings', '--check')
+        call_command('recalculate_ratings')
+        call_command('recalculate_ratings', '--check')
+
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum, title.rating) == (
+            2, 13, 6
+        ), 'Проверьте, что команда восстанавливает агрегаты оценок'
+
+    def test_recalculate_ratings_refreshes_cache(self, client, title, user):
+        Review.objects.bulk_create(
+            [Review(title=title, author=user, text='Отзыв', score=8)]
+        )
+        response = client.get('/api/v1/titles/')
+        assert response.json()['results'][0]['rating'] is None
+        etag = response['ETag']
+        assert client.get(
+            '/api/v1/titles/', HTTP_IF_NONE_MATCH=etag
+        ).status_code == 304
+
+        call_command('recalculate_ratings')
+
+        response = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что пересчёт рейтингов сбрасывает кэш произведений'
+        )
+        assert response.json()['results'][0]['rating'] == 8
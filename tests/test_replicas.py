@@ -0,0 +1,109 @@
+import pytest
+from django.db import OperationalError, connections
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api import routers
+from api.authentication import access_token_for
+from api.views import TitleViewSet
+from reviews.models import Title
+
+DATABASES = ['default', 'replica']
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+
+
+@pytest.fixture
+def user_client(user):
+    user_client = APIClient()
+    user_client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {access_token_for(user)}'
+    )
+    return user_client
+
+
+def capture(alias):
+    return CaptureQueriesContext(connections[alias])
+
+
+@pytest.mark.django_db(transaction=True, databases=DATABASES)
+class TestReplicaRouting:
+
+    def test_reads_go_to_replica(self, user_client, title, replicas):
+        user_client.get(f'/api/v1/titles/{title.id}/reviews/')
+        with capture('default') as primary, capture('replica') as replica:
+            response = user_client.get(
+                f'/api/v1/titles/{title.id}/reviews/'
+            )
+        assert response.status_code == 200
+        assert len(replica) > 0, 'Проверьте, что чтение API идёт с реплики'
+        assert len(primary) == 1, (
+            'Проверьте, что из основной базы читается только состояние '
+            'для ETag'
+        )
+        assert 'ETag' not in response, (
+            'Проверьте, что к ответу с реплики не добавляется ETag'
+        )
+        assert routers.get_read_database() is None
+
+    def test_cached_reads_use_primary(self, client, title, replicas):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        with capture('replica') as replica:
+            response = client.get(url)
+        assert response.status_code == 200 and 'ETag' in response
+        assert len(replica) == 0, (
+            'Проверьте, что ответ для общего кэша собирается '
+            'по основной базе'
+        )
+        cached = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert cached.status_code == 304
+
+    def test_token_state_from_primary(self, user_client, title, replicas):
+        with capture('replica') as replica:
+            response = user_client.get(
+                f'/api/v1/titles/{title.id}/reviews/'
+            )
+        assert response.status_code == 200
+        assert len(replica) > 0
+        assert not any('tokens_valid_after' in query['sql']
+                       for query in replica.captured_queries), (
+            'Проверьте, что отметка отзыва токенов читается из основной базы'
+        )
+
+    def test_read_your_writes(self, user_client, title, replicas):
+        response = user_client.post(f'/api/v1/titles/{title.id}/reviews/',
+                                    {'text': 'Отзыв', 'score': 7})
+        assert response.status_code == 201
+        with capture('default') as primary, capture('replica') as replica:
+            user_client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert len(primary) > 0 and len(replica) == 0, (
+            'Проверьте, что после записи автор читает из основной базы'
+        )
+
+    def test_failover_to_primary(self, user_client, title, replicas,
+                                 monkeypatch):
+        get_queryset = TitleViewSet.get_queryset
+
+        def broken_replica(view):
+            if routers.get_read_database() == 'replica':
+                raise OperationalError('реплика недоступна')
+            return get_queryset(view)
+
+        monkeypatch.setattr(TitleViewSet, 'get_queryset', broken_replica)
+        assert user_client.get('/api/v1/titles/').status_code == 200, (
+            'Проверьте, что запрос повторяется на основной базе'
+        )
+        assert routers.choose_replica() is None, (
+            'Проверьте, что недоступная реплика исключается из выбора'
+        )
+
+    def test_writes_of_replica_objects_go_to_primary(self, title):
+        with routers.read_from('replica'):
+            title = Title.objects.get(pk=title.pk)
+        assert title._state.db == 'replica'
+        with capture('default') as primary:
+            title.save()
+        assert len(primary) > 0
@@ -0,0 +1,55 @@
+import pytest
+
+from api.search.stemmer import stem
+from reviews.models import Review, Title
+
+
+class TestStemmer:
+
+    @pytest.mark.parametrize('words', [
+        ('книга', 'книги', 'книгами'),
+        ('крестный', 'крестного', 'крестным'),
+        ('звёзды', 'звезд', 'звездами'),
+    ])
+    def test_word_forms(self, words):
+        assert len({stem(word) for word in words}) == 1, (
+            'Проверьте, что формы одного слова сводятся к одной основе'
+        )
+
+
+@pytest.mark.django_db
+class TestSearch:
+
+    def test_query_required(self, client):
+        assert client.get('/api/v1/search/').status_code == 400
+
+    def test_ranked_results(self, client, title, user):
+        Review.objects.create(
+            title=title, author=user, score=10,
+            text='Тюрьма, надежда и побег — лучший фильм о свободе'
+        )
+        response = client.get('/api/v1/search/?q=побега')
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert [(item['type'], item['title_id']) for item in results] == [
+            ('title', title.id), ('review', title.id)
+        ], (
+            'Проверьте, что совпадение в названии ранжируется выше, '
+            'чем в тексте отзыва'
+        )
+
+    def test_incremental_updates(self, client, title, user):
+        client.get('/api/v1/search/?q=шоушенк')
+        review = Review.objects.create(
+            title=title, author=user, score=7, text='Про гамбургеры'
+        )
+        response = client.get('/api/v1/search/?q=гамбургер&type=review')
+        assert [item['id'] for item in response.json()['results']] == [
+            review.id
+        ], 'Проверьте, что новый отзыв сразу попадает в индекс'
+
+        Title.objects.get(pk=title.pk).delete()
+        response = client.get('/api/v1/search/?q=гамбургер')
+        assert response.json()['count'] == 0, (
+            'Проверьте, что удалённые объекты пропадают из индекса'
+        )
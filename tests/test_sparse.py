@@ -0,0 +1,59 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+
+    def test_titles_fields(self, client, title):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/?fields=id,name,rating')
+        assert response.status_code == 200
+        assert set(response.json()['results'][0]) == {
+            'id', 'name', 'rating'
+        }, 'Проверьте, что ?fields= оставляет только указанные поля'
+        sql = '\n'.join(query['sql'] for query in context.captured_queries)
+        assert 'description' not in sql and 'reviews_genre' not in sql, (
+            'Проверьте, что ненужные колонки и связи не читаются из базы'
+        )
+        assert len(context.captured_queries) == 2
+
+    def test_titles_detail_omit(self, client, title):
+        response = client.get(
+            f'/api/v1/titles/{title.id}/?omit=genre,description'
+        )
+        data = response.json()
+        assert 'genre' not in data and 'description' not in data
+        assert data['category'] == {'name': 'Фильм', 'slug': 'movie'}
+
+    def test_reviews_cursor_omit_text(self, client, title, user):
+        review = Review.objects.create(title=title, author=user,
+                                       text='Длинный текст', score=8)
+        Comment.objects.create(review=review, author=user, text='К')
+        response = client.get(
+            f'/api/v1/titles/{title.id}/reviews/'
+            '?pagination=cursor&omit=text'
+        )
+        assert response.json()['results'] == [{
+            'id': review.id, 'author': user.username, 'score': 8,
+            'pub_date': response.json()['results'][0]['pub_date'],
+        }]
+        response = client.get(
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+            '?fields=author'
+        )
+        assert response.json()['results'] == [{'author': user.username}]
+
+    def test_users_and_errors(self, admin_client, client, user):
+        response = admin_client.get('/api/v1/users/?fields=username,role')
+        assert all(
+            set(item) == {'username', 'role'}
+            for item in response.json()['results']
+        )
+        response = client.get('/api/v1/titles/?fields=id,secret')
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестные поля отклоняются'
+        )
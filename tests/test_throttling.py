@@ -0,0 +1,98 @@
+import pytest
+
+from api.throttling import SlidingWindowThrottle
+from reviews.models import Review
+
+RATES = {
+    'anon': '3/min',
+    'write': '2/min',
+    'write:admin': None,
+    'search': '3/min',
+    'signup': '2/min',
+    'signup:ip': '3/min',
+    'token': '2/min',
+    'token:ip': '3/min',
+}
+
+
+@pytest.fixture
+def rates(monkeypatch):
+    monkeypatch.setattr(SlidingWindowThrottle, 'THROTTLE_RATES', RATES)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [600.0]
+    monkeypatch.setattr(SlidingWindowThrottle, 'timer', lambda self: now[0])
+    return now
+
+
+@pytest.mark.django_db
+class TestThrottling:
+
+    def test_anon_reads(self, client, rates, clock):
+        for _ in range(3):
+            assert client.get('/api/v1/genres/').status_code == 200
+        response = client.get('/api/v1/genres/')
+        assert response.status_code == 429
+        assert int(response['Retry-After']) == 80, (
+            'Проверьте заголовок Retry-After'
+        )
+        # В следующем окне учитывается доля прошлого: через 10 секунд
+        # 3 * 5/6 + 1 > 3, через 25 секунд 3 * 35/60 + 1 < 3
+        clock[0] += 70
+        assert client.get('/api/v1/genres/').status_code == 429
+        clock[0] += 15
+        assert client.get('/api/v1/genres/').status_code == 200
+
+    def test_write_rates_by_role(self, user_client, admin_client, user,
+                                 title, rates, clock):
+        review = Review.objects.create(title=title, author=user,
+                                       text='Отзыв', score=5)
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        for _ in range(2):
+            assert user_client.post(url, {'text': 'К'}).status_code == 201
+        assert user_client.post(url, {'text': 'К'}).status_code == 429, (
+            'Проверьте лимит записи для пользователя'
+        )
+        assert user_client.get(url).status_code == 200, (
+            'Проверьте, что чтение с токеном не ограничивается лимитом записи'
+        )
+        for _ in range(5):
+            assert admin_client.post(url, {'text': 'К'}).status_code == 201, (
+                'Проверьте, что для администратора лимит записи снят'
+            )
+
+    def test_auth_rates_by_ip(self, client, rates, clock):
+        for number in range(3):
+            assert client.post('/api/v1/auth/signup/', {
+                'username': f'user{number}',
+                'email': f'user{number}@yamdb.fake',
+            }).status_code == 200
+            assert client.post('/api/v1/auth/token/', {
+                'username': f'user{number}', 'confirmation_code': 'x'
+            }).status_code == 400
+        assert client.post('/api/v1/auth/signup/', {
+            'username': 'user3', 'email': 'user3@yamdb.fake'
+        }).status_code == 429, (
+            'Проверьте лимит регистраций с одного IP при смене username'
+        )
+        assert client.post('/api/v1/auth/token/', {
+            'username': 'user3', 'confirmation_code': 'x'
+        }).status_code == 429, (
+            'Проверьте лимит получения токена с одного IP при смене username'
+        )
+
+    def test_token_rate_not_shared_between_ips(self, client, user, rates,
+                                               clock):
+        data = {'username': user.username, 'confirmation_code': 'x'}
+        for _ in range(2):
+            client.post('/api/v1/auth/token/', data,
+                        REMOTE_ADDR='10.0.0.1')
+        assert client.post('/api/v1/auth/token/', data,
+                           REMOTE_ADDR='10.0.0.1').status_code == 429
+        assert client.post('/api/v1/auth/token/', data,
+                           REMOTE_ADDR='10.0.0.2').status_code == 400, (
+            'Проверьте, что запросы с чужого IP не исчерпывают лимит '
+            'владельца username'
+        )